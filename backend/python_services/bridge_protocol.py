@@ -0,0 +1,373 @@
+#!/usr/bin/env python3
+"""
+Binary Bridge Protocol for the IndicTrans2 Worker
+=================================================
+
+Lets the Node.js backend keep one Python worker alive and exchange
+length-prefixed binary frames over stdin/stdout instead of spawning a
+process per text and parsing a JSON blob from stdout.
+
+Frame layout (little-endian):
+    magic      2 bytes   b'PM'
+    version    u8
+    type       u8        FRAME_* constant
+    request_id u32       echoed back on the response
+    length     u32       payload length in bytes
+    payload    length bytes
+
+Message payload (FRAME_REQUEST / FRAME_RESPONSE):
+    meta_len   u32
+    meta       meta_len bytes of UTF-8 JSON (op, src_lang, tgt_lang, ...)
+    strings    string table
+
+String table:
+    count      u32
+    offsets    (count + 1) x u32, relative to the start of the data
+    data       concatenated UTF-8 strings
+
+For large batches the string table can live in a POSIX shared-memory
+segment instead (FRAME_REQUEST_SHM / FRAME_RESPONSE_SHM): the frame then
+only carries the meta JSON with {"shm": <name>, "size": <bytes>}. The
+sender owns and unlinks the segments it creates; for responses that is
+the worker, which hands ownership over to the client.
+
+A JSON-lines mode (one JSON object per line) remains for debugging.
+"""
+
+import io
+import sys
+import json
+import struct
+import logging
+from itertools import accumulate
+from multiprocessing import shared_memory
+from typing import List, Dict, Any, Optional, Tuple, BinaryIO
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b'PM'
+VERSION = 1
+
+FRAME_REQUEST = 1
+FRAME_RESPONSE = 2
+FRAME_REQUEST_SHM = 3
+FRAME_RESPONSE_SHM = 4
+FRAME_ERROR = 5
+
+HEADER = struct.Struct('<2sBBII')
+U32 = struct.Struct('<I')
+
+# Model management ops forwarded to the service when it implements them
+ADMIN_OPS = ('swap_model', 'rollback_model', 'model_status')
+
+# Batches with at least this many payload bytes are answered through shared memory
+SHM_THRESHOLD = 64 * 1024
+
+
+class ProtocolError(Exception):
+    """Raised on malformed frames"""
+
+
+def encode_string_table(texts: List[str]) -> bytes:
+    """Encode strings as a count + offset table + UTF-8 data block"""
+    encoded = [text.encode('utf-8') for text in texts]
+    offsets = accumulate((len(e) for e in encoded), initial=0)
+    table = struct.pack(f'<{len(encoded) + 2}I', len(encoded), *offsets)
+    return table + b''.join(encoded)
+
+
+def string_table_size(texts: List[str]) -> Tuple[List[bytes], int]:
+    """Encoded strings and the total size of their string table"""
+    encoded = [text.encode('utf-8') for text in texts]
+    return encoded, 4 * (len(encoded) + 2) + sum(len(e) for e in encoded)
+
+
+def write_string_table(buf: memoryview, encoded: List[bytes], offset: int = 0) -> int:
+    """Write pre-encoded strings into `buf` in place; returns bytes written"""
+    offsets = list(accumulate((len(e) for e in encoded), initial=0))
+    struct.pack_into(f'<{len(offsets) + 1}I', buf, offset, len(encoded), *offsets)
+    pos = offset + 4 * (len(offsets) + 1)
+    for chunk in encoded:
+        buf[pos:pos + len(chunk)] = chunk
+        pos += len(chunk)
+    return pos - offset
+
+
+def decode_string_table(buf, offset: int = 0) -> List[str]:
+    """Decode a string table from any buffer without copying the data block"""
+    view = memoryview(buf)
+    (count,) = U32.unpack_from(view, offset)
+    offsets = struct.unpack_from(f'<{count + 1}I', view, offset + 4)
+    base = offset + 4 * (count + 2)
+    return [str(view[base + start:base + end], 'utf-8')
+            for start, end in zip(offsets, offsets[1:])]
+
+
+def pack_message(meta: Dict[str, Any], texts: Optional[List[str]] = None) -> bytes:
+    """Build a message payload from meta JSON and an optional string table"""
+    meta_bytes = json.dumps(meta, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    return U32.pack(len(meta_bytes)) + meta_bytes + encode_string_table(texts or [])
+
+
+def unpack_message(payload: bytes) -> Tuple[Dict[str, Any], List[str]]:
+    """Split a message payload into meta JSON and strings"""
+    view = memoryview(payload)
+    (meta_len,) = U32.unpack_from(view, 0)
+    meta = json.loads(str(view[4:4 + meta_len], 'utf-8'))
+    texts = decode_string_table(view, 4 + meta_len) if len(view) > 4 + meta_len else []
+    return meta, texts
+
+
+def _read_exact(stream: BinaryIO, size: int) -> Optional[bytes]:
+    chunks = []
+    remaining = size
+    while remaining:
+        chunk = stream.read(remaining)
+        if not chunk:
+            if remaining == size:
+                return None
+            raise ProtocolError(f"Stream closed with {remaining} bytes missing")
+        chunks.append(chunk)
+        remaining -= len(chunk)
+    return chunks[0] if len(chunks) == 1 else b''.join(chunks)
+
+
+def read_frame(stream: BinaryIO) -> Optional[Tuple[int, int, bytes]]:
+    """Read one frame; returns (type, request_id, payload) or None on EOF"""
+    header = _read_exact(stream, HEADER.size)
+    if header is None:
+        return None
+    magic, version, frame_type, request_id, length = HEADER.unpack(header)
+    if magic != MAGIC or version != VERSION:
+        raise ProtocolError(f"Bad frame header: magic={magic!r} version={version}")
+    payload = _read_exact(stream, length) if length else b''
+    if payload is None:
+        raise ProtocolError("Stream closed before frame payload")
+    return frame_type, request_id, payload
+
+
+def write_frame(stream: BinaryIO, frame_type: int, request_id: int, payload: bytes) -> None:
+    """Write one frame and flush it"""
+    stream.write(HEADER.pack(MAGIC, VERSION, frame_type, request_id, len(payload)))
+    stream.write(payload)
+    stream.flush()
+
+
+def _untrack(shm: shared_memory.SharedMemory) -> None:
+    """
+    Stop this process's resource tracker from unlinking a segment it does
+    not own (Python < 3.13 tracks every attached segment).
+    """
+    try:
+        from multiprocessing import resource_tracker
+        resource_tracker.unregister(shm._name, 'shared_memory')
+    except Exception:
+        pass
+
+
+def create_shared_batch(texts: List[str]) -> Tuple[shared_memory.SharedMemory, int]:
+    """Write texts into a new shared-memory segment; returns (segment, size)"""
+    encoded, size = string_table_size(texts)
+    shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+    write_string_table(shm.buf, encoded)
+    return shm, size
+
+
+def read_shared_batch(name: str, unlink: bool = False) -> List[str]:
+    """Read texts from a shared-memory segment created by the peer"""
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        return decode_string_table(shm.buf)
+    finally:
+        if unlink:
+            shm.close()
+            shm.unlink()
+        else:
+            _untrack(shm)
+            shm.close()
+
+
+class BridgeServer:
+    """
+    Serves translation requests from a long-lived worker process
+
+    `service` is any object with translate_batch(texts, src_lang, tgt_lang)
+    returning a list of result dicts and get_supported_languages(), plus
+    translate_multi(texts, src_lang, tgt_langs) for the 'translate_multi' op
+    and the ADMIN_OPS methods, which receive meta['args'] as keyword arguments.
+    """
+
+    def __init__(self, service, shm_threshold: int = SHM_THRESHOLD):
+        self.service = service
+        self.shm_threshold = shm_threshold
+        # Response segments stay mapped until the next frame arrives, since on
+        # Windows a segment disappears once its last handle is closed
+        self._outstanding: List[shared_memory.SharedMemory] = []
+
+    def handle(self, meta: Dict[str, Any], texts: List[str]) -> Tuple[Dict[str, Any], List[str]]:
+        """Run one request; returns response meta and translated strings"""
+        op = meta.get('op', 'translate')
+
+        if op == 'ping':
+            return {'success': True}, []
+        if op == 'languages':
+            return {'success': True, 'languages': self.service.get_supported_languages()}, []
+        if op in ADMIN_OPS:
+            handler = getattr(self.service, op, None)
+            if handler is None:
+                return {'success': False, 'error': f"Op not supported by this worker: {op}"}, []
+            return dict({'success': True}, **handler(**meta.get('args', {}))), []
+        if op == 'translate_multi':
+            return self._handle_multi(meta, texts)
+        if op != 'translate':
+            return {'success': False, 'error': f"Unknown op: {op}"}, []
+
+        results = self.service.translate_batch(
+            texts, meta.get('src_lang', 'en'), meta.get('tgt_lang', 'hi')
+        )
+        response = {
+            'success': all(r.get('success', False) for r in results),
+            'source_language': results[0]['source_language'] if results else meta.get('src_lang'),
+            'target_language': results[0]['target_language'] if results else meta.get('tgt_lang'),
+        }
+        errors = [r['error'] for r in results if 'error' in r]
+        if errors:
+            response['error'] = errors[0]
+        for key in ('degraded', 'tier'):
+            values = [r[key] for r in results if key in r]
+            if values:
+                response[key] = values
+        return response, [r['translated'] for r in results]
+
+    def _handle_multi(self, meta: Dict[str, Any], texts: List[str]) -> Tuple[Dict[str, Any], List[str]]:
+        """Fan out to meta['tgt_langs']; translations are returned target-major"""
+        tgt_langs = meta.get('tgt_langs', [])
+        results = self.service.translate_multi(texts, meta.get('src_lang', 'en'), tgt_langs)
+        response = {
+            'success': all(r.get('success', False) for tgt in tgt_langs for r in results[tgt]),
+            'target_languages': tgt_langs,
+            'routes': {tgt: results[tgt][0].get('route') if results[tgt] else None for tgt in tgt_langs},
+        }
+        return response, [r['translated'] for tgt in tgt_langs for r in results[tgt]]
+
+    def _respond(self, out: BinaryIO, request_id: int, meta: Dict[str, Any],
+                 texts: List[str], prefer_shm: bool) -> None:
+        encoded, size = string_table_size(texts)
+        if prefer_shm and size >= self.shm_threshold:
+            shm = shared_memory.SharedMemory(create=True, size=size)
+            write_string_table(shm.buf, encoded)
+            meta = dict(meta, shm=shm.name, size=size)
+            # Ownership passes to the client, which unlinks after reading
+            _untrack(shm)
+            self._outstanding.append(shm)
+            write_frame(out, FRAME_RESPONSE_SHM, request_id, pack_message(meta))
+        else:
+            write_frame(out, FRAME_RESPONSE, request_id, pack_message(meta, texts))
+
+    def _release_outstanding(self) -> None:
+        while self._outstanding:
+            self._outstanding.pop().close()
+
+    def serve_binary(self, instream: BinaryIO, outstream: BinaryIO) -> None:
+        """Serve framed requests until EOF"""
+        while True:
+            frame = read_frame(instream)
+            self._release_outstanding()
+            if frame is None:
+                return
+            frame_type, request_id, payload = frame
+            try:
+                meta, texts = unpack_message(payload)
+                if frame_type == FRAME_REQUEST_SHM:
+                    texts = read_shared_batch(meta['shm'])
+                elif frame_type != FRAME_REQUEST:
+                    raise ProtocolError(f"Unexpected frame type: {frame_type}")
+                response, translations = self.handle(meta, texts)
+                self._respond(outstream, request_id, response, translations,
+                              prefer_shm=frame_type == FRAME_REQUEST_SHM)
+            except Exception as e:
+                logger.error(f"Request {request_id} failed: {e}")
+                error = json.dumps({'success': False, 'error': str(e)}).encode('utf-8')
+                write_frame(outstream, FRAME_ERROR, request_id, error)
+
+    def serve_jsonl(self, instream: io.TextIOBase, outstream: io.TextIOBase) -> None:
+        """Serve one JSON object per line until EOF (debugging fallback)"""
+        for line in instream:
+            if not line.strip():
+                continue
+            request_id = None
+            try:
+                request = json.loads(line)
+                request_id = request.get('id')
+                texts = request.get('texts')
+                if texts is None:
+                    texts = [request['text']] if 'text' in request else []
+                response, translations = self.handle(request, texts)
+                response['translated'] = translations
+            except Exception as e:
+                response = {'success': False, 'error': str(e)}
+            response['id'] = request_id
+            outstream.write(json.dumps(response, ensure_ascii=False) + '\n')
+            outstream.flush()
+
+
+class BridgeClient:
+    """Minimal Python client for the binary protocol (tests and load generation)"""
+
+    def __init__(self, instream: BinaryIO, outstream: BinaryIO, shm_threshold: int = SHM_THRESHOLD):
+        # instream: worker stdout, outstream: worker stdin
+        self.instream = instream
+        self.outstream = outstream
+        self.shm_threshold = shm_threshold
+        self.next_id = 1
+
+    def request(self, meta: Dict[str, Any], texts: Optional[List[str]] = None
+                ) -> Tuple[Dict[str, Any], List[str]]:
+        request_id = self.next_id
+        self.next_id = (self.next_id + 1) & 0xFFFFFFFF
+        texts = texts or []
+
+        shm = None
+        # Same UTF-8 byte count the server uses for its responses
+        if string_table_size(texts)[1] >= self.shm_threshold:
+            shm, size = create_shared_batch(texts)
+            write_frame(self.outstream, FRAME_REQUEST_SHM, request_id,
+                        pack_message(dict(meta, shm=shm.name, size=size)))
+        else:
+            write_frame(self.outstream, FRAME_REQUEST, request_id, pack_message(meta, texts))
+
+        try:
+            frame = read_frame(self.instream)
+        finally:
+            if shm is not None:
+                shm.close()
+                shm.unlink()
+        if frame is None:
+            raise ProtocolError("Worker closed the stream")
+
+        frame_type, response_id, payload = frame
+        if response_id != request_id:
+            raise ProtocolError(f"Response id {response_id} does not match request {request_id}")
+        if frame_type == FRAME_ERROR:
+            return json.loads(payload.decode('utf-8')), []
+        response, translations = unpack_message(payload)
+        if frame_type == FRAME_RESPONSE_SHM:
+            translations = read_shared_batch(response['shm'], unlink=True)
+        return response, translations
+
+    def translate(self, texts: List[str], src_lang: str, tgt_lang: str
+                  ) -> Tuple[Dict[str, Any], List[str]]:
+        return self.request({'op': 'translate', 'src_lang': src_lang, 'tgt_lang': tgt_lang}, texts)
+
+
+def serve(service, protocol: str = 'binary') -> None:
+    """Serve on this process's stdin/stdout"""
+    if protocol == 'jsonl':
+        BridgeServer(service).serve_jsonl(sys.stdin, sys.stdout)
+        return
+
+    instream = sys.stdin.buffer
+    outstream = sys.stdout.buffer
+    # Anything printed by model libraries must not corrupt the frame stream
+    sys.stdout = sys.stderr
+    BridgeServer(service).serve_binary(instream, outstream)
@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+"""
+Content Manifest for Incremental Retranslation
+==============================================
+
+Records, for every managed content item (alert templates, FAQ entries,
+questionnaire text) and target language, the content hash of each segment,
+the model revision that translated it and the translation itself. A
+retranslation run diffs the current content against the manifest and only
+sends new or changed segments, or segments translated by a stale model
+revision, to the model.
+
+Usage:
+    python content_manifest.py refresh <corpus.json> --langs hi,te [--db manifest.db]
+                               [--engine mock|local] [--output translations.json] [--prune]
+
+corpus.json is either {"<content_id>": "<text>", ...} or a list of
+{"id": "<content_id>", "text": "<text>"} objects.
+
+Output:
+    JSON summary of the run
+"""
+
+import re
+import sys
+import json
+import time
+import sqlite3
+import hashlib
+import argparse
+import logging
+import unicodedata
+from pathlib import Path
+from dataclasses import dataclass, field
+from typing import List, Dict, Tuple, Callable, Optional, Any
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+DEFAULT_DB_PATH = Path(__file__).parent / 'content_manifest.db'
+
+# Split on line breaks and after sentence-final punctuation (incl. danda),
+# keeping the separators so translated text keeps the original layout
+_SEGMENT_SPLIT = re.compile(r'(\s*\n\s*|(?<=[.!?।॥])\s+)')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS segments (
+    content_id     TEXT    NOT NULL,
+    lang           TEXT    NOT NULL,
+    idx            INTEGER NOT NULL,
+    source_hash    TEXT    NOT NULL,
+    model_revision TEXT    NOT NULL,
+    translation    TEXT    NOT NULL,
+    updated_at     REAL    NOT NULL,
+    PRIMARY KEY (content_id, lang, idx)
+);
+CREATE INDEX IF NOT EXISTS segments_by_hash ON segments (lang, source_hash, model_revision);
+"""
+
+# translate_fn(texts, lang) -> translations, None for segments to retry on the next run
+TranslateFn = Callable[[List[str], str], List[Optional[str]]]
+
+
+def split_segments(text: str) -> Tuple[List[str], List[str]]:
+    """Split text into segments and the separators between them"""
+    parts = _SEGMENT_SPLIT.split(text)
+    return parts[0::2], parts[1::2]
+
+
+def join_segments(segments: List[str], separators: List[str]) -> str:
+    """Inverse of split_segments"""
+    out = [segments[0]]
+    for separator, segment in zip(separators, segments[1:]):
+        out.append(separator)
+        out.append(segment)
+    return ''.join(out)
+
+
+def segment_hash(segment: str) -> str:
+    """Content hash of a segment, insensitive to Unicode normalization form"""
+    normalized = unicodedata.normalize('NFC', segment.strip())
+    return hashlib.blake2b(normalized.encode('utf-8'), digest_size=16).hexdigest()
+
+
+@dataclass
+class RetranslationPlan:
+    """Diff of a corpus against the manifest for one model revision"""
+    model_revision: str
+    # (content_id, lang) -> [(hash, source segment, stored translation or None)]
+    items: Dict[Tuple[str, str], List[Tuple[str, str, Optional[str]]]] = field(default_factory=dict)
+    separators: Dict[str, List[str]] = field(default_factory=dict)
+    # lang -> {hash: source segment} still needing the model
+    pending: Dict[str, Dict[str, str]] = field(default_factory=dict)
+    stats: Dict[str, int] = field(default_factory=lambda: {
+        'segments': 0, 'unchanged': 0, 'new': 0, 'changed': 0, 'stale': 0, 'reused': 0, 'deferred': 0,
+    })
+
+    @property
+    def pending_count(self) -> int:
+        return sum(len(segments) for segments in self.pending.values())
+
+
+class ManifestStore:
+    """SQLite-backed manifest of translated segments"""
+
+    def __init__(self, db_path: Path = DEFAULT_DB_PATH):
+        self.db_path = str(db_path)
+        self.conn = sqlite3.connect(self.db_path)
+        self.conn.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def _load(self, lang: str) -> Dict[str, Dict[int, Tuple[str, str, str]]]:
+        rows = self.conn.execute(
+            'SELECT content_id, idx, source_hash, model_revision, translation '
+            'FROM segments WHERE lang = ?', (lang,)
+        )
+        entries: Dict[str, Dict[int, Tuple[str, str, str]]] = {}
+        for content_id, idx, source_hash, revision, translation in rows:
+            entries.setdefault(content_id, {})[idx] = (source_hash, revision, translation)
+        return entries
+
+    def plan(self, corpus: Dict[str, str], langs: List[str], model_revision: str) -> RetranslationPlan:
+        """Diff the corpus against the manifest"""
+        plan = RetranslationPlan(model_revision)
+        split = {content_id: split_segments(text) for content_id, text in corpus.items()}
+        hashes = {content_id: [segment_hash(s) for s in segments]
+                  for content_id, (segments, _) in split.items()}
+        for content_id, (_, separators) in split.items():
+            plan.separators[content_id] = separators
+
+        stats = plan.stats
+        for lang in langs:
+            stored = self._load(lang)
+            # Current-revision translations by hash, so moved or repeated segments are reused
+            by_hash = {h: tr for entries in stored.values()
+                       for h, rev, tr in entries.values() if rev == model_revision}
+            pending = plan.pending.setdefault(lang, {})
+
+            for content_id, (segments, _) in split.items():
+                entries = stored.get(content_id, {})
+                planned = []
+                for idx, (segment, h) in enumerate(zip(segments, hashes[content_id])):
+                    stats['segments'] += 1
+                    if not segment.strip():
+                        planned.append((h, segment, segment))
+                        continue
+
+                    entry = entries.get(idx)
+                    if entry is not None and entry[0] == h and entry[1] == model_revision:
+                        stats['unchanged'] += 1
+                        planned.append((h, segment, entry[2]))
+                        continue
+
+                    if entry is None:
+                        stats['new'] += 1
+                    elif entry[0] != h:
+                        stats['changed'] += 1
+                    else:
+                        stats['stale'] += 1
+
+                    if h in by_hash:
+                        stats['reused'] += 1
+                        planned.append((h, segment, by_hash[h]))
+                    else:
+                        pending[h] = segment
+                        planned.append((h, segment, None))
+                plan.items[(content_id, lang)] = planned
+
+        return plan
+
+    def apply(self, plan: RetranslationPlan, translate_fn: TranslateFn,
+              batch_size: int = 32) -> Dict[str, Dict[str, str]]:
+        """
+        Translate pending segments in batches, update the manifest and
+        return the assembled translations as {content_id: {lang: text}}
+
+        Segments the engine returns None for (shed or failed) are not
+        recorded, so the next refresh retries them, and items containing
+        them are left out of the results.
+        """
+        translated: Dict[str, Dict[str, str]] = {}
+        for lang, pending in plan.pending.items():
+            done = translated.setdefault(lang, {})
+            hashes = list(pending)
+            for i in range(0, len(hashes), batch_size):
+                chunk = hashes[i:i + batch_size]
+                translations = translate_fn([pending[h] for h in chunk], lang)
+                for h, translation in zip(chunk, translations):
+                    if translation is not None:
+                        done[h] = translation
+        plan.stats['deferred'] = sum(len(p) - len(translated[lang]) for lang, p in plan.pending.items())
+
+        now = time.time()
+        rows = []
+        results: Dict[str, Dict[str, str]] = {}
+        for (content_id, lang), planned in plan.items.items():
+            done = translated.get(lang, {})
+            segments = []
+            for idx, (h, _, translation) in enumerate(planned):
+                if translation is None:
+                    translation = done.get(h)
+                    if translation is None:
+                        segments = None
+                        continue
+                rows.append((content_id, lang, idx, h, plan.model_revision, translation, now))
+                if segments is not None:
+                    segments.append(translation)
+            if segments is not None:
+                results.setdefault(content_id, {})[lang] = join_segments(segments, plan.separators[content_id])
+
+        with self.conn:
+            self.conn.executemany(
+                'INSERT INTO segments (content_id, lang, idx, source_hash, model_revision, translation, updated_at) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?) '
+                'ON CONFLICT (content_id, lang, idx) DO UPDATE SET '
+                'source_hash = excluded.source_hash, model_revision = excluded.model_revision, '
+                'translation = excluded.translation, updated_at = excluded.updated_at '
+                'WHERE segments.source_hash != excluded.source_hash '
+                'OR segments.model_revision != excluded.model_revision',
+                rows
+            )
+            # Drop trailing segments of items that got shorter
+            for (content_id, lang), planned in plan.items.items():
+                self.conn.execute(
+                    'DELETE FROM segments WHERE content_id = ? AND lang = ? AND idx >= ?',
+                    (content_id, lang, len(planned))
+                )
+
+        return results
+
+    def prune(self, keep_ids: List[str]) -> int:
+        """Remove manifest entries for content that no longer exists"""
+        with self.conn:
+            self.conn.execute('CREATE TEMP TABLE IF NOT EXISTS keep_ids (content_id TEXT PRIMARY KEY)')
+            self.conn.execute('DELETE FROM keep_ids')
+            self.conn.executemany('INSERT OR IGNORE INTO keep_ids VALUES (?)', ((i,) for i in keep_ids))
+            cursor = self.conn.execute(
+                'DELETE FROM segments WHERE content_id NOT IN (SELECT content_id FROM keep_ids)'
+            )
+        return cursor.rowcount
+
+    def refresh(self, corpus: Dict[str, str], langs: List[str], model_revision: str,
+                translate_fn: TranslateFn,
+                batch_size: int = 32) -> Tuple[Dict[str, Dict[str, str]], Dict[str, Any]]:
+        """Plan and apply an incremental retranslation of the corpus"""
+        start = time.perf_counter()
+        plan = self.plan(corpus, langs, model_revision)
+        results = self.apply(plan, translate_fn, batch_size)
+        summary = dict(plan.stats)
+        summary.update({
+            'items': len(corpus),
+            'languages': len(langs),
+            'translated': plan.pending_count - plan.stats['deferred'],
+            'model_revision': model_revision,
+            'seconds': round(time.perf_counter() - start, 3),
+        })
+        return results, summary
+
+
+def load_corpus(path: str) -> Dict[str, str]:
+    """Read a corpus file as {content_id: text}"""
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+    if isinstance(data, dict):
+        return {str(k): v for k, v in data.items()}
+    return {str(item['id']): item['text'] for item in data}
+
+
+def _engine(name: str) -> Tuple[TranslateFn, str]:
+    """Translate function and model revision for an engine"""
+    if name == 'mock':
+        from mock_translation import mock_translate
+        return (lambda texts, lang: [mock_translate(t, lang) for t in texts]), 'mock'
+    import translation_service
+
+    def translate(texts: List[str], lang: str) -> List[Optional[str]]:
+        # Untranslated or degraded text must not be recorded under the model revision
+        results = translation_service.translate_detailed(texts, lang, 'refresh')
+        return [None if r['degraded'] or r['tier'] == 'passthrough' else r['translated'] for r in results]
+
+    return translate, translation_service.get_model_revision()
+
+
+def main():
+    """Main function for command line usage"""
+    parser = argparse.ArgumentParser(description='Incremental retranslation of managed content')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    refresh = subparsers.add_parser('refresh', help='Retranslate changed segments of a corpus')
+    refresh.add_argument('corpus', help='JSON corpus file')
+    refresh.add_argument('--langs', required=True, help='Comma-separated target languages')
+    refresh.add_argument('--db', default=str(DEFAULT_DB_PATH))
+    refresh.add_argument('--engine', choices=['mock', 'local'], default='local')
+    refresh.add_argument('--batch-size', type=int, default=32)
+    refresh.add_argument('--output', help='Write {content_id: {lang: text}} to this file')
+    refresh.add_argument('--prune', action='store_true', help='Drop entries for removed content')
+    args = parser.parse_args()
+
+    try:
+        corpus = load_corpus(args.corpus)
+        langs = [lang.strip() for lang in args.langs.split(',') if lang.strip()]
+        translate_fn, revision = _engine(args.engine)
+
+        store = ManifestStore(Path(args.db))
+        try:
+            results, summary = store.refresh(corpus, langs, revision, translate_fn, args.batch_size)
+            if args.prune:
+                summary['pruned'] = store.prune(list(corpus))
+        finally:
+            store.close()
+
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8') as f:
+                json.dump(results, f, ensure_ascii=False, indent=2)
+
+        print(json.dumps({'success': True, **summary}, ensure_ascii=False, indent=2))
+
+    except Exception as e:
+        logger.error(f"Refresh failed: {e}")
+        print(json.dumps({'success': False, 'error': str(e)}, ensure_ascii=False))
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
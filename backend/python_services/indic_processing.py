@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+IndicTrans2 Pre/Post-processing
+Batched replacement for IndicTransToolkit's IndicProcessor without external
+dependencies: Unicode normalization, punctuation and numeral normalization,
+script unification to Devanagari and the "<src> <tgt>" language-tag prefix
+on the way in; special-token cleanup, spacing fixes and conversion back to
+the target script on the way out.
+
+Everything per language pair is compiled once into str.translate tables
+and regexes, so a batch is processed in a single comprehension.
+
+Usage:
+    python indic_processing.py --benchmark [strings] [--with-model]
+
+With --with-model the benchmark also times beam-search generation on the
+loaded IndicTrans2 model and reports processing as a share of it.
+"""
+
+import re
+import sys
+import json
+import time
+import unicodedata
+from typing import List, Dict, Optional, Union
+
+# Offset of each Brahmic script block from Devanagari (U+0900). The blocks
+# share a layout, so script unification is a fixed per-codepoint shift.
+SCRIPT_BLOCKS = {
+    'Deva': 0x0900,
+    'Beng': 0x0980,
+    'Guru': 0x0A00,
+    'Gujr': 0x0A80,
+    'Orya': 0x0B00,
+    'Taml': 0x0B80,
+    'Telu': 0x0C00,
+    'Knda': 0x0C80,
+    'Mlym': 0x0D00,
+}
+DEVANAGARI = 0x0900
+BLOCK_SIZE = 0x80
+
+# Digit blocks normalized to ASCII on input
+_DIGIT_ZEROS = [
+    0x0660,  # Arabic-Indic
+    0x06F0,  # Extended Arabic-Indic
+    0x0966,  # Devanagari
+    0x09E6,  # Bengali
+    0x0A66,  # Gurmukhi
+    0x0AE6,  # Gujarati
+    0x0B66,  # Odia
+    0x0BE6,  # Tamil
+    0x0C66,  # Telugu
+    0x0CE6,  # Kannada
+    0x0D66,  # Malayalam
+    0x1C50,  # Ol Chiki
+    0xABF0,  # Meetei Mayek
+]
+
+# Punctuation variants normalized on input
+_PUNCTUATION = {
+    '‘': "'", '’': "'", '‚': "'", '‛': "'", '′': "'",
+    '“': '"', '”': '"', '„': '"', '‟': '"', '″': '"',
+    '«': '"', '»': '"',
+    '‐': '-', '‑': '-', '‒': '-', '–': '-', '—': ' - ', '―': ' - ',
+    '−': '-',
+    '…': '...',
+    '，': ',', '．': '.', '！': '!', '？': '?', '：': ':', '；': ';',
+    '（': '(', '）': ')',
+    '、': ',', '。': '.',
+    '\u00a0': ' ', '\u2002': ' ', '\u2003': ' ', '\u2009': ' ', '\u202f': ' ', '\u3000': ' ',
+    '\u200b': None, '\ufeff': None, '\u00ad': None,
+    # ZWJ/ZWNJ (U+200D/U+200C) are meaningful in Indic scripts and are kept
+}
+
+_SPECIAL_TOKENS = re.compile(r'</?s>|<pad>|<unk>|<2\w+>')
+# Stray spaces the detokenizer leaves before closing and after opening punctuation;
+# zero-width lookarounds keep the substitution template-free
+_DETOKENIZE_SPACES = re.compile(r' (?=[,.!?:;।॥)\]}%])|(?<=[(\[{]) ')
+
+
+def _script(lang: str) -> str:
+    """Script suffix of an IndicTrans2 language tag, e.g. 'tel_Telu' -> 'Telu'"""
+    return lang.rsplit('_', 1)[-1] if '_' in lang else ''
+
+
+def _block_map(from_base: int, to_base: int) -> Dict[int, int]:
+    """Codepoint shift between two aligned blocks, limited to assigned characters"""
+    table = {}
+    for offset in range(BLOCK_SIZE):
+        src, dst = from_base + offset, to_base + offset
+        if unicodedata.name(chr(src), None) and unicodedata.name(chr(dst), None):
+            table[src] = dst
+    return table
+
+
+def _input_table(src_lang: str) -> Dict[int, Union[int, str, None]]:
+    table: Dict[int, Union[int, str, None]] = {ord(k): v for k, v in _PUNCTUATION.items()}
+    for zero in _DIGIT_ZEROS:
+        for digit in range(10):
+            table[zero + digit] = ord('0') + digit
+    base = SCRIPT_BLOCKS.get(_script(src_lang))
+    if base is not None and base != DEVANAGARI:
+        # Digits were already mapped to ASCII above and must stay that way
+        table.update({k: v for k, v in _block_map(base, DEVANAGARI).items() if k not in table})
+    return table
+
+
+def _output_table(tgt_lang: str) -> Optional[Dict[int, int]]:
+    base = SCRIPT_BLOCKS.get(_script(tgt_lang))
+    if base is None or base == DEVANAGARI:
+        return None
+    table = _block_map(DEVANAGARI, base)
+    # Danda and double danda are shared by all Brahmic scripts
+    table.pop(0x0964, None)
+    table.pop(0x0965, None)
+    return table
+
+
+class IndicProcessor:
+    """
+    Pre/post-processor for IndicTrans2 that works on whole batches
+
+    Tables are built lazily per language and reused across batches.
+    """
+
+    def __init__(self, inference: bool = True):
+        self.inference = inference
+        self._input_tables: Dict[str, Dict[int, Union[int, str, None]]] = {}
+        self._output_tables: Dict[str, Optional[Dict[int, int]]] = {}
+
+    def _get_input_table(self, src_lang: str):
+        table = self._input_tables.get(src_lang)
+        if table is None:
+            table = self._input_tables[src_lang] = _input_table(src_lang)
+        return table
+
+    def _get_output_table(self, tgt_lang: str):
+        if tgt_lang not in self._output_tables:
+            self._output_tables[tgt_lang] = _output_table(tgt_lang)
+        return self._output_tables[tgt_lang]
+
+    def preprocess_batch(self, texts: List[str], src_lang: str, tgt_lang: str) -> List[str]:
+        """
+        Normalize texts and add the "<src_lang> <tgt_lang> " prefix IndicTrans2 expects
+        """
+        table = self._get_input_table(src_lang)
+        prefix = f"{src_lang} {tgt_lang} "
+        normalize = unicodedata.normalize
+        is_normalized = unicodedata.is_normalized
+        # str.split()/join collapses and strips whitespace faster than a regex
+        return [
+            prefix + ' '.join((t if is_normalized('NFC', t) else normalize('NFC', t))
+                              .translate(table).split())
+            for t in texts
+        ]
+
+    def postprocess_batch(self, generated_tokens: Union[str, List[str]], lang: str) -> List[str]:
+        """
+        Clean decoded model output and convert it back to the target script
+        """
+        if isinstance(generated_tokens, str):
+            generated_tokens = [generated_tokens]
+        table = self._get_output_table(lang)
+        strip_tokens = _SPECIAL_TOKENS.sub
+        fix_spaces = _DETOKENIZE_SPACES.sub
+
+        cleaned = [
+            fix_spaces('', ' '.join(strip_tokens('', str(t)).split()))
+            for t in generated_tokens
+        ]
+        if table is not None:
+            cleaned = [t.translate(table) for t in cleaned]
+        return cleaned
+
+
+_BENCHMARK_SAMPLES = [
+    'Alert: Disease outbreak detected in your area – restrict “animal movement” now…',
+    'Vaccination due on 12/03 for 25 cattle.',
+    'Submit',
+    'कृपया जैव सुरक्षा प्रश्नावली भरें । पशु संख्या: १२',
+    'పశువుల సంఖ్య ౧౨',
+]
+
+
+def generation_cost(batch_size: int = 16, rounds: int = 3) -> Optional[float]:
+    """
+    Microseconds per 1k strings for one batched generate call on the loaded
+    model (best of `rounds`), or None when the model cannot be loaded
+    """
+    try:
+        import translation_service
+        pool = translation_service.initialize_service()
+    except Exception as e:
+        print(f"Model unavailable, skipping generation timing: {e}", file=sys.stderr)
+        return None
+
+    # The first three samples are English, the service's source language
+    texts = [_BENCHMARK_SAMPLES[i % 3] for i in range(batch_size)]
+    timings = []
+    with pool.acquire() as service:
+        service._generate(texts, 'te')  # first call pays for lazy initialization
+        for _ in range(rounds):
+            start = time.perf_counter()
+            service._generate(texts, 'te')
+            timings.append(time.perf_counter() - start)
+    return min(timings) / batch_size * 1000 * 1e6
+
+
+def benchmark(count: int = 10000, rounds: int = 5, with_model: bool = False) -> Dict[str, float]:
+    """
+    Microseconds per 1k strings for pre- and postprocessing (best of
+    `rounds`), and with `with_model` the same for generation
+    """
+    texts = [_BENCHMARK_SAMPLES[i % len(_BENCHMARK_SAMPLES)] for i in range(count)]
+    outputs = ['<s> पशुओं को अलग रखें , और पशु चिकित्सक को बुलाएँ । </s>'] * count
+    processor = IndicProcessor()
+
+    def best(fn):
+        timings = []
+        for _ in range(rounds):
+            start = time.perf_counter()
+            fn()
+            timings.append(time.perf_counter() - start)
+        return min(timings) / count * 1000 * 1e6
+
+    report = {
+        'strings': count,
+        'preprocess_us_per_1k': round(best(
+            lambda: processor.preprocess_batch(texts, 'eng_Latn', 'tel_Telu')), 1),
+        'preprocess_indic_us_per_1k': round(best(
+            lambda: processor.preprocess_batch(texts, 'tel_Telu', 'hin_Deva')), 1),
+        'postprocess_us_per_1k': round(best(
+            lambda: processor.postprocess_batch(outputs, 'tel_Telu')), 1),
+    }
+
+    if with_model:
+        generation = generation_cost()
+        if generation is not None:
+            processing = report['preprocess_us_per_1k'] + report['postprocess_us_per_1k']
+            report['generate_us_per_1k'] = round(generation, 1)
+            # Generation includes its own processing, so this is the share of a full call
+            report['processing_share_of_generate'] = round(processing / generation, 6)
+    return report
+
+
+if __name__ == '__main__':
+    args = [arg for arg in sys.argv[1:] if arg != '--with-model']
+    if args and args[0] == '--benchmark':
+        count = int(args[1]) if len(args) > 1 else 10000
+        print(json.dumps(benchmark(count, with_model='--with-model' in sys.argv), indent=2))
+    else:
+        print("Usage: python indic_processing.py --benchmark [strings] [--with-model]")
+        sys.exit(1)
@@ -8,11 +8,18 @@ It handles translation requests from the PashuMitra Portal backend.
 
 Usage:
     python indictrans2_service.py <text> <src_lang> <tgt_lang>
+    python indictrans2_service.py --serve [binary|jsonl]
     
 Arguments:
     text: Text to translate
     src_lang: Source language code (e.g., 'eng_Latn', 'hin_Deva')
-    tgt_lang: Target language code
+    tgt_lang: Target language code, or a comma-separated list to fan out
+              one source text to several languages
+    --serve: Keep the model loaded and answer requests on stdin/stdout using
+             the framed protocol from bridge_protocol.py (default), or one
+             JSON object per line with 'jsonl' for debugging. Under load,
+             batches are answered from cache or untranslated and marked
+             'degraded' instead of queueing into the caller's timeout
     
 Output:
     JSON response with translation result
@@ -24,7 +31,13 @@ import os
 import logging
 import warnings
 from pathlib import Path
-from typing import Union, List, Dict, Any
+import time
+from typing import Union, List, Dict, Any, Optional
+
+from pivot_router import PivotRouter, PIVOT_LANG
+from translation_cache import TranslationCache
+from overload_control import OverloadController, TIER_FULL, TIER_GREEDY, TIER_CACHE, TIER_PASSTHROUGH
+from mock_translation import MOCK_TRANSLATIONS
 
 # Suppress HuggingFace warnings
 warnings.filterwarnings("ignore", message=".*resume_download.*")
@@ -44,6 +57,7 @@ class IndicTrans2Service:
     def __init__(self):
         """Initialize the translation service"""
         self.translator = None
+        self.router = None
         self.initialized = False
         
         # Language code mapping from common codes to IndicTrans2 codes
@@ -77,6 +91,14 @@ class IndicTrans2Service:
         
         # Reverse mapping
         self.reverse_lang_mapping = {v: k for k, v in self.lang_mapping.items()}
+        
+        # Worker-mode requests queue for one translator, so batches are shed to
+        # cheaper tiers instead of running into the Node bridge timeout
+        self.overload = OverloadController(slots=1)
+        self.cache = TranslationCache(maxsize=1000)
+        # Curated translations double as the phrase table for degraded answers
+        for lang, phrases in MOCK_TRANSLATIONS.items():
+            self.cache.add_phrases(self.lang_mapping[lang], phrases)
     
     def initialize(self):
         """Initialize the IndicTrans2 translator"""
@@ -89,6 +111,8 @@ class IndicTrans2Service:
             
             # Initialize translator
             self.translator = IndicTrans2Translator()
+            # Indic->Indic pairs go direct or through English, whichever measures faster
+            self.router = PivotRouter(self._translate_texts)
             self.initialized = True
             logger.info("IndicTrans2 service initialized successfully")
             
@@ -99,6 +123,84 @@ class IndicTrans2Service:
             logger.error(f"Failed to initialize IndicTrans2 service: {e}")
             raise
     
+    def _translate_texts(self, texts: List[str], src_lang: str, tgt_lang: str) -> List[str]:
+        """Translate a batch with the underlying translator (IndicTrans2 codes)"""
+        translated = self.translator.translate(texts, src_lang, tgt_lang)
+        return [translated] if isinstance(translated, str) else list(translated)
+    
+    @staticmethod
+    def _cache_lang(src_lang: str, tgt_lang: str) -> str:
+        """Cache key language; English-source entries share keys with the phrase table"""
+        return tgt_lang if src_lang == PIVOT_LANG else f"{src_lang}>{tgt_lang}"
+    
+    def _translate_tiered(self, texts: List[str], src_lang: str, tgt_langs: List[str],
+                          priority: str) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Translate a batch into one or more targets (IndicTrans2 codes), stepping
+        down to cheaper tiers when the translator is overloaded
+        
+        Cache misses of all targets share one slot on the translator and one
+        router fan-out, so an Indic source is decoded to English only once.
+        Returns {tgt_lang: [result]} with 'translated', 'tier', 'degraded' and,
+        for generated text, 'route'. The translator has no beam setting, so
+        the full and greedy tiers both run it.
+        """
+        start = time.monotonic()
+        results: Dict[str, List[Optional[Dict[str, Any]]]] = {}
+        misses: Dict[str, Dict[str, List[int]]] = {}
+        
+        for tgt_lang in tgt_langs:
+            cache_lang = self._cache_lang(src_lang, tgt_lang)
+            results[tgt_lang] = [None] * len(texts)
+            for i, text in enumerate(texts):
+                cached = self.cache.get(text, cache_lang)
+                if cached is not None:
+                    results[tgt_lang][i] = {'translated': cached, 'tier': 'hit', 'degraded': False}
+                else:
+                    misses.setdefault(tgt_lang, {}).setdefault(text, []).append(i)
+        
+        if misses:
+            pending = list(dict.fromkeys(text for by_text in misses.values() for text in by_text))
+            tier = self.overload.choose_tier(priority)
+            generated = None
+            
+            if tier in (TIER_FULL, TIER_GREEDY):
+                remaining = self.overload.budget(priority) - (time.monotonic() - start)
+                with self.overload.slot(timeout=remaining) as acquired:
+                    if acquired:
+                        try:
+                            generated = self.router.translate_fanout(pending, src_lang, list(misses))
+                        except Exception as e:
+                            logger.error(f"Translation error for {len(pending)} text(s) to {list(misses)}: {e}")
+                if generated is None:
+                    # Budget ran out while queued for the translator, or translation failed
+                    tier = TIER_CACHE
+            
+            for tgt_lang, by_text in misses.items():
+                cache_lang = self._cache_lang(src_lang, tgt_lang)
+                if generated is not None:
+                    translations = dict(zip(pending, generated[0][tgt_lang]))
+                    route = generated[1][tgt_lang]
+                for text, indices in by_text.items():
+                    if generated is not None:
+                        self.cache.put(text, cache_lang, translations[text])
+                        result = {'translated': translations[text], 'tier': tier, 'degraded': False,
+                                  'route': route}
+                    else:
+                        fallback = None
+                        if tier == TIER_CACHE:
+                            fallback = self.cache.lookup_degraded(text, cache_lang)
+                        result = {
+                            'translated': fallback if fallback is not None else text,
+                            'tier': TIER_CACHE if fallback is not None else TIER_PASSTHROUGH,
+                            'degraded': True,
+                        }
+                    self.overload.record(priority, result['tier'])
+                    for i in indices:
+                        results[tgt_lang][i] = result
+        
+        return results
+    
     def normalize_language_code(self, lang_code: str) -> str:
         """Convert common language code to IndicTrans2 format"""
         if lang_code in self.lang_mapping:
@@ -142,18 +244,21 @@ class IndicTrans2Service:
                 }
             
             # Perform translation
-            translated_text = self.translator.translate(
-                text, 
+            result = self._translate_tiered(
+                [text], 
                 src_lang_norm, 
-                tgt_lang_norm
-            )
+                [tgt_lang_norm],
+                'interactive'
+            )[tgt_lang_norm][0]
             
             return {
                 'success': True,
                 'original': text,
-                'translated': translated_text,
+                'translated': result['translated'],
                 'source_language': src_lang_norm,
-                'target_language': tgt_lang_norm
+                'target_language': tgt_lang_norm,
+                'tier': result['tier'],
+                'degraded': result['degraded']
             }
             
         except Exception as e:
@@ -167,14 +272,18 @@ class IndicTrans2Service:
                 'error': str(e)
             }
     
-    def translate_batch(self, texts: List[str], src_lang: str, tgt_lang: str) -> List[Dict[str, Any]]:
+    def translate_batch(self, texts: List[str], src_lang: str, tgt_lang: str,
+                        priority: Optional[str] = None) -> List[Dict[str, Any]]:
         """
-        Translate multiple texts
+        Translate multiple texts, shedding load to cheaper tiers when the
+        translator is saturated
         
         Args:
             texts: List of texts to translate
             src_lang: Source language code
             tgt_lang: Target language code
+            priority: 'interactive' or 'batch'; defaults to interactive for a
+                      single text and batch otherwise
             
         Returns:
             List of translation results
@@ -200,20 +309,25 @@ class IndicTrans2Service:
                 } for text in texts]
             
             # Perform batch translation
-            translated_texts = self.translator.translate(
+            if priority is None:
+                priority = 'interactive' if len(texts) == 1 else 'batch'
+            translated = self._translate_tiered(
                 texts, 
                 src_lang_norm, 
-                tgt_lang_norm
-            )
+                [tgt_lang_norm],
+                priority
+            )[tgt_lang_norm]
             
             results = []
-            for i, (original, translated) in enumerate(zip(texts, translated_texts)):
+            for original, result in zip(texts, translated):
                 results.append({
                     'success': True,
                     'original': original,
-                    'translated': translated,
+                    'translated': result['translated'],
                     'source_language': src_lang_norm,
-                    'target_language': tgt_lang_norm
+                    'target_language': tgt_lang_norm,
+                    'tier': result['tier'],
+                    'degraded': result['degraded']
                 })
             
             return results
@@ -229,6 +343,67 @@ class IndicTrans2Service:
                 'error': str(e)
             } for text in texts]
     
+    def translate_multi(self, texts: List[str], src_lang: str, tgt_langs: List[str],
+                        priority: str = 'batch') -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Translate texts into several target languages at once
+        
+        For an Indic source the English intermediate is decoded once and
+        shared by every target routed through the pivot. The whole fan-out
+        takes one slot on the translator and is shed like a batch under load.
+        
+        Args:
+            texts: List of texts to translate
+            src_lang: Source language code
+            tgt_langs: Target language codes
+            priority: 'interactive' or 'batch'
+            
+        Returns:
+            Dictionary of target language code -> list of translation results
+        """
+        try:
+            # Initialize if needed
+            if not self.initialized:
+                self.initialize()
+            
+            src_lang_norm = self.normalize_language_code(src_lang)
+            targets = {tgt: self.normalize_language_code(tgt) for tgt in tgt_langs}
+            
+            translated = self._translate_tiered(
+                texts, 
+                src_lang_norm, 
+                list(dict.fromkeys(targets.values())),
+                priority
+            )
+            
+            return {
+                tgt: [{
+                    'success': True,
+                    'original': original,
+                    'translated': result['translated'],
+                    'source_language': src_lang_norm,
+                    'target_language': tgt_norm,
+                    'route': result.get('route'),
+                    'tier': result['tier'],
+                    'degraded': result['degraded']
+                } for original, result in zip(texts, translated[tgt_norm])]
+                for tgt, tgt_norm in targets.items()
+            }
+            
+        except Exception as e:
+            logger.error(f"Multi-target translation error: {e}")
+            return {
+                tgt: [{
+                    'success': False,
+                    'original': text,
+                    'translated': text,  # Fallback to original
+                    'source_language': src_lang,
+                    'target_language': tgt,
+                    'error': str(e)
+                } for text in texts]
+                for tgt in tgt_langs
+            }
+    
     def get_supported_languages(self) -> List[str]:
         """Get list of supported language codes"""
         return list(self.lang_mapping.keys())
@@ -236,6 +411,13 @@ class IndicTrans2Service:
 
 def main():
     """Main function for command line usage"""
+    # Worker mode talks bytes on stdin/stdout, so it runs before the Windows re-wrap below
+    if len(sys.argv) > 1 and sys.argv[1] == '--serve':
+        from bridge_protocol import serve
+        protocol = sys.argv[2] if len(sys.argv) > 2 else 'binary'
+        serve(IndicTrans2Service(), protocol)
+        return
+    
     # Set UTF-8 encoding for Windows
     if os.name == 'nt':  # Windows
         import codecs
@@ -255,7 +437,18 @@ def main():
     
     try:
         service = IndicTrans2Service()
-        result = service.translate_text(text, src_lang, tgt_lang)
+        if ',' in tgt_lang:
+            # Comma-separated targets fan out from a single source decode
+            results = service.translate_multi([text], src_lang, tgt_lang.split(','))
+            result = {
+                'success': all(r[0]['success'] for r in results.values()),
+                'original': text,
+                'source_language': src_lang,
+                'translations': {tgt: r[0]['translated'] for tgt, r in results.items()},
+                'routes': {tgt: r[0].get('route') for tgt, r in results.items()}
+            }
+        else:
+            result = service.translate_text(text, src_lang, tgt_lang)
         print(json.dumps(result, ensure_ascii=False, indent=None))
         
     except Exception as e:
@@ -0,0 +1,496 @@
+#!/usr/bin/env python3
+"""
+Load Generator for the PashuMitra Translation Service
+=====================================================
+
+Replays a realistic traffic mix (UI labels, long alerts, batch calls,
+multi-language broadcasts and cache-hitting repeats) against the Python
+translation service and reports latency percentiles, throughput, error
+and shed rates over time.
+
+Usage:
+    python load_test.py --target mock --mode open --rate 20 --duration 30
+    python load_test.py --target mock --mode closed --concurrency 8
+    python load_test.py --target mock --find-knee --slo-p99 1.5
+
+Targets:
+    mock:   in-process mock engine with a simulated single-model service time
+    local:  in-process translation_service (loads the IndicTrans2 model)
+    bridge: spawns indictrans2_service.py per text, the way the Node backend does
+    worker: one persistent indictrans2_service.py --serve worker (binary protocol)
+
+Output:
+    JSON report on stdout
+"""
+
+import sys
+import json
+import math
+import time
+import random
+import argparse
+import logging
+import subprocess
+import threading
+from pathlib import Path
+from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional
+
+from mock_translation import mock_translate, MOCK_TRANSLATIONS
+from translation_cache import TranslationCache
+from overload_control import OverloadController, TIER_FULL, TIER_GREEDY, TIER_CACHE, TIER_PASSTHROUGH
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Sample content for each traffic class
+UI_LABELS = [
+    'Submit', 'Cancel', 'Dashboard', 'Farm details', 'Report a disease',
+    'My alerts', 'Contact veterinarian', 'Upload photo', 'Save changes',
+    'Biosecurity score', 'Language', 'Logout', 'Profile', 'Next question',
+    'Previous', 'Number of animals', 'Vaccination date', 'Search', 'Help',
+]
+
+ALERT_SENTENCES = [
+    'Alert: Disease outbreak detected in your area.',
+    'Avian influenza has been confirmed in poultry farms within 10 km of your location.',
+    'Restrict movement of animals and visitors until further notice.',
+    'Disinfect footwear and vehicles at the farm entrance every day.',
+    'Report any sudden deaths or drop in egg production to your veterinarian immediately.',
+    'Keep feed and water sources covered to avoid contact with wild birds.',
+    'Isolate sick animals and do not sell or move them.',
+    'The district animal husbandry office will conduct a survey next week.',
+]
+
+BROADCAST_LANGUAGES = ['hi', 'bn', 'te', 'mr', 'ta', 'gu', 'kn', 'ml', 'pa', 'or']
+
+# (traffic class, weight) - roughly what the portal sends in a day
+DEFAULT_MIX = {
+    'ui_label': 0.45,
+    'cache_repeat': 0.25,
+    'long_alert': 0.15,
+    'batch': 0.10,
+    'broadcast': 0.05,
+}
+
+
+@dataclass
+class LoadRequest:
+    """A single logical request sent to the target"""
+    kind: str
+    texts: List[str]
+    target_langs: List[str]
+    src_lang: str = 'en'
+
+
+@dataclass
+class Sample:
+    """Outcome of one request"""
+    kind: str
+    start: float
+    latency: float
+    success: bool
+    shed: bool = False
+
+
+class TrafficMix:
+    """Generates requests following the weighted traffic mix"""
+
+    def __init__(self, weights: Optional[Dict[str, float]] = None, seed: Optional[int] = None):
+        self.weights = weights or DEFAULT_MIX
+        self.kinds = list(self.weights)
+        self.cum_weights = []
+        total = 0.0
+        for kind in self.kinds:
+            total += self.weights[kind]
+            self.cum_weights.append(total)
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        # Hot set for repeats: strings the mock table and the cache already know
+        self.hot_set = list(MOCK_TRANSLATIONS['hi'])
+
+    def restart(self) -> None:
+        """Start the request sequence over (reproducible only with a seed)"""
+        with self.lock:
+            self.rng = random.Random(self.seed)
+
+    def next_request(self) -> LoadRequest:
+        with self.lock:
+            rng = self.rng
+            kind = rng.choices(self.kinds, cum_weights=self.cum_weights)[0]
+            lang = rng.choice(BROADCAST_LANGUAGES[:5])
+
+            if kind == 'ui_label':
+                return LoadRequest(kind, [rng.choice(UI_LABELS)], [lang])
+            if kind == 'cache_repeat':
+                return LoadRequest(kind, [rng.choice(self.hot_set)], ['hi'])
+            if kind == 'long_alert':
+                count = rng.randint(3, len(ALERT_SENTENCES))
+                return LoadRequest(kind, [' '.join(rng.sample(ALERT_SENTENCES, count))], [lang])
+            if kind == 'batch':
+                size = rng.randint(10, 40)
+                return LoadRequest(kind, [rng.choice(UI_LABELS) for _ in range(size)], [lang])
+            if kind == 'broadcast':
+                langs = rng.sample(BROADCAST_LANGUAGES, rng.randint(4, 8))
+                return LoadRequest(kind, [' '.join(rng.sample(ALERT_SENTENCES, 3))], langs)
+
+            raise ValueError(f"Unknown traffic class: {kind}")
+
+
+class MockTarget:
+    """
+    In-process mock engine.
+
+    Models a fixed number of model workers with a service time that grows
+    with input length, plus an exact-match cache, so the load curve shows
+    a real saturation point without needing the model weights. With
+    `overload=True` the workers sit behind the service's OverloadController
+    and requests are shed to cheaper tiers the same way.
+    """
+
+    # Greedy decoding is roughly this much cheaper than beam search
+    GREEDY_SPEEDUP = 0.4
+
+    def __init__(self, workers: int = 1, base_ms: float = 20.0, per_char_ms: float = 0.15,
+                 cache_size: int = 5000, overload: bool = False):
+        self.workers = workers
+        self.cache_size = cache_size
+        self.overload = overload
+        self.slots = threading.Semaphore(workers)
+        self.base_s = base_ms / 1000.0
+        self.per_char_s = per_char_ms / 1000.0
+        self.reset()
+
+    def reset(self) -> None:
+        """Empty the cache and overload state so each run starts cold"""
+        self.cache = TranslationCache(maxsize=self.cache_size)
+        self.controller = OverloadController(slots=self.workers) if self.overload else None
+
+    def _generate(self, texts: List[str], lang: str, scale: float = 1.0) -> List[str]:
+        # One batched "generate" call for all misses
+        time.sleep(scale * (self.base_s + self.per_char_s * sum(len(t) for t in texts)))
+        translations = [mock_translate(text, lang) for text in texts]
+        for text, value in zip(texts, translations):
+            self.cache.put(text, lang, value)
+        return translations
+
+    def _translate(self, texts: List[str], lang: str, priority: str) -> bool:
+        """Translate texts; returns True if the answer was degraded"""
+        misses = [text for text in texts if self.cache.get(text, lang) is None]
+        if not misses:
+            return False
+
+        if self.controller is None:
+            with self.slots:
+                self._generate(misses, lang)
+            return False
+
+        start = time.perf_counter()
+        tier = self.controller.choose_tier(priority)
+        if tier in (TIER_FULL, TIER_GREEDY):
+            remaining = self.controller.budget(priority) - (time.perf_counter() - start)
+            with self.controller.slot(timeout=remaining) as acquired:
+                if acquired:
+                    self._generate(misses, lang, 1.0 if tier == TIER_FULL else self.GREEDY_SPEEDUP)
+                    self.controller.record(priority, tier, len(misses))
+                    return False
+            tier = TIER_CACHE
+        if tier == TIER_CACHE:
+            found = sum(1 for text in misses if self.cache.lookup_degraded(text, lang) is not None)
+            self.controller.record(priority, TIER_CACHE, found)
+            self.controller.record(priority, TIER_PASSTHROUGH, len(misses) - found)
+        else:
+            self.controller.record(priority, tier, len(misses))
+        return True
+
+    def send(self, request: LoadRequest) -> Dict[str, Any]:
+        priority = 'batch' if request.kind in ('batch', 'broadcast') else 'interactive'
+        degraded = False
+        for lang in request.target_langs:
+            degraded = self._translate(request.texts, lang, priority) or degraded
+        return {'success': True, 'degraded': degraded}
+
+
+class LocalTarget:
+    """In-process translation_service (loads the real model)"""
+
+    def __init__(self):
+        import translation_service
+        self.service = translation_service
+        self.service.initialize_service()
+
+    def send(self, request: LoadRequest) -> Dict[str, Any]:
+        priority = 'batch' if request.kind in ('batch', 'broadcast') else 'interactive'
+        degraded = False
+        for lang in request.target_langs:
+            results = self.service.translate_detailed(request.texts, lang, priority)
+            degraded = degraded or any(r['degraded'] for r in results)
+        return {'success': True, 'degraded': degraded}
+
+
+class BridgeTarget:
+    """Spawns indictrans2_service.py for every text, mirroring the Node bridge"""
+
+    def __init__(self, python: str = sys.executable, timeout: float = 30.0):
+        self.python = python
+        self.script = str(Path(__file__).parent / 'indictrans2_service.py')
+        self.timeout = timeout
+
+    def send(self, request: LoadRequest) -> Dict[str, Any]:
+        success = True
+        for lang in request.target_langs:
+            for text in request.texts:
+                proc = subprocess.run(
+                    [self.python, self.script, text, request.src_lang, lang],
+                    capture_output=True, timeout=self.timeout
+                )
+                result = json.loads(proc.stdout.decode('utf-8'))
+                success = success and result.get('success', False)
+        return {'success': success}
+
+
+class WorkerTarget:
+    """One persistent indictrans2_service.py worker speaking the binary protocol"""
+
+    def __init__(self, python: str = sys.executable):
+        from bridge_protocol import BridgeClient
+        script = str(Path(__file__).parent / 'indictrans2_service.py')
+        self.process = subprocess.Popen([python, script, '--serve'],
+                                        stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+        self.client = BridgeClient(self.process.stdout, self.process.stdin)
+        # The worker answers frames in order, so requests are serialized here
+        self.lock = threading.Lock()
+
+    def send(self, request: LoadRequest) -> Dict[str, Any]:
+        success, degraded = True, False
+        for lang in request.target_langs:
+            with self.lock:
+                meta, _ = self.client.translate(request.texts, request.src_lang, lang)
+            success = success and meta.get('success', False)
+            degraded = degraded or any(meta.get('degraded', []))
+        return {'success': success, 'degraded': degraded}
+
+
+TARGETS = {
+    'mock': MockTarget,
+    'local': LocalTarget,
+    'bridge': BridgeTarget,
+    'worker': WorkerTarget,
+}
+
+
+def _execute(target, request: LoadRequest, start: float, origin: float) -> Sample:
+    """Send a request and time it from its intended start"""
+    try:
+        result = target.send(request)
+        success = bool(result.get('success', False))
+        shed = bool(result.get('degraded', False))
+    except Exception as e:
+        logger.debug(f"Request failed: {e}")
+        success, shed = False, False
+    return Sample(request.kind, start - origin, time.perf_counter() - start, success, shed)
+
+
+def run_open_loop(target, mix: TrafficMix, rate: float, duration: float,
+                  max_workers: int = 256, seed: Optional[int] = None) -> List[Sample]:
+    """
+    Open-loop run: Poisson arrivals at `rate` req/s regardless of how fast
+    the target answers. Latency is measured from the scheduled arrival time,
+    so queueing in the generator itself is not hidden (no coordinated omission).
+    """
+    rng = random.Random(seed)
+    futures = []
+    origin = time.perf_counter()
+    next_arrival = origin
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        while True:
+            next_arrival += rng.expovariate(rate)
+            if next_arrival - origin >= duration:
+                break
+            delay = next_arrival - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            futures.append(pool.submit(_execute, target, mix.next_request(), next_arrival, origin))
+
+    return [f.result() for f in futures]
+
+
+def run_closed_loop(target, mix: TrafficMix, concurrency: int, duration: float) -> List[Sample]:
+    """Closed-loop run: `concurrency` clients each send back-to-back requests"""
+    samples: List[Sample] = []
+    lock = threading.Lock()
+    origin = time.perf_counter()
+    deadline = origin + duration
+
+    def client():
+        local = []
+        while time.perf_counter() < deadline:
+            local.append(_execute(target, mix.next_request(), time.perf_counter(), origin))
+        with lock:
+            samples.extend(local)
+
+    threads = [threading.Thread(target=client, daemon=True) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    return samples
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100.0 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def _stats(samples: List[Sample], elapsed: float) -> Dict[str, Any]:
+    latencies = sorted(s.latency for s in samples)
+    count = len(samples)
+    errors = sum(1 for s in samples if not s.success)
+    shed = sum(1 for s in samples if s.shed)
+    return {
+        'count': count,
+        'throughput': round(count / elapsed, 3) if elapsed > 0 else 0.0,
+        'p50': round(percentile(latencies, 50), 4),
+        'p90': round(percentile(latencies, 90), 4),
+        'p95': round(percentile(latencies, 95), 4),
+        'p99': round(percentile(latencies, 99), 4),
+        'max': round(latencies[-1], 4) if latencies else 0.0,
+        'error_rate': round(errors / count, 4) if count else 0.0,
+        'shed_rate': round(shed / count, 4) if count else 0.0,
+    }
+
+
+def summarize(samples: List[Sample], duration: float, window: float = 5.0) -> Dict[str, Any]:
+    """Overall, per-class and per-window statistics"""
+    by_kind: Dict[str, List[Sample]] = {}
+    for sample in samples:
+        by_kind.setdefault(sample.kind, []).append(sample)
+
+    timeline = []
+    windows = max(1, math.ceil(duration / window))
+    buckets: List[List[Sample]] = [[] for _ in range(windows)]
+    for sample in samples:
+        buckets[min(int(sample.start // window), windows - 1)].append(sample)
+    for i, bucket in enumerate(buckets):
+        stats = _stats(bucket, window)
+        stats['t'] = round(i * window, 3)
+        timeline.append(stats)
+
+    return {
+        'overall': _stats(samples, duration),
+        'by_kind': {kind: _stats(group, duration) for kind, group in sorted(by_kind.items())},
+        'timeline': timeline,
+    }
+
+
+def find_knee(target, mix: TrafficMix, slo_p99: float, start_rate: float = 2.0,
+              growth: float = 1.5, max_rate: float = 1000.0, step_duration: float = 10.0,
+              max_bad_rate: float = 0.01, refine_steps: int = 2,
+              seed: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Find the saturation knee: the highest open-loop arrival rate at which
+    p99 stays within the SLO, the target keeps up with the offered load and
+    errors plus shed requests stay under `max_bad_rate`.
+
+    Rates grow geometrically until a step fails, then the interval between
+    the last good and first bad rate is bisected `refine_steps` times.
+    Every step starts from the same request sequence and, for targets with
+    reset(), a cold cache, so higher rates are not measured against a
+    cache warmed by the steps before them.
+    """
+    steps = []
+
+    def healthy(rate: float) -> bool:
+        mix.restart()
+        if hasattr(target, 'reset'):
+            target.reset()
+        samples = run_open_loop(target, mix, rate, step_duration, seed=seed)
+        # Completion time of the slowest request bounds the real elapsed time
+        elapsed = max([step_duration] + [s.start + s.latency for s in samples])
+        stats = _stats(samples, elapsed)
+        # Keeping up means the backlog drains shortly after arrivals stop
+        ok = (
+            stats['count'] > 0
+            and stats['p99'] <= slo_p99
+            and stats['throughput'] >= 0.9 * stats['count'] / step_duration
+            and stats['error_rate'] + stats['shed_rate'] <= max_bad_rate
+        )
+        stats.update({'offered_rate': round(rate, 3), 'healthy': ok})
+        steps.append(stats)
+        logger.info(f"rate={rate:.2f} req/s p99={stats['p99']}s "
+                    f"throughput={stats['throughput']} healthy={ok}")
+        return ok
+
+    good, bad = 0.0, None
+    rate = start_rate
+    while rate <= max_rate:
+        if not healthy(rate):
+            bad = rate
+            break
+        good = rate
+        rate *= growth
+
+    if bad is not None and good > 0:
+        for _ in range(refine_steps):
+            mid = (good + bad) / 2.0
+            if healthy(mid):
+                good = mid
+            else:
+                bad = mid
+
+    return {
+        'knee_rate': round(good, 3),
+        'first_unhealthy_rate': round(bad, 3) if bad is not None else None,
+        'slo_p99': slo_p99,
+        'steps': steps,
+    }
+
+
+def main():
+    """Main function for command line usage"""
+    parser = argparse.ArgumentParser(description='Load generator for the translation service')
+    parser.add_argument('--target', choices=sorted(TARGETS), default='mock')
+    parser.add_argument('--mode', choices=['open', 'closed'], default='open')
+    parser.add_argument('--rate', type=float, default=10.0, help='Open-loop arrivals per second')
+    parser.add_argument('--concurrency', type=int, default=4, help='Closed-loop clients')
+    parser.add_argument('--duration', type=float, default=30.0, help='Seconds per run or knee step')
+    parser.add_argument('--window', type=float, default=5.0, help='Timeline window in seconds')
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--find-knee', action='store_true', help='Search for the saturation knee')
+    parser.add_argument('--slo-p99', type=float, default=2.0, help='p99 latency SLO in seconds')
+    parser.add_argument('--mock-workers', type=int, default=1)
+    parser.add_argument('--mock-overload', action='store_true',
+                        help='Put the mock engine behind the overload controller')
+    args = parser.parse_args()
+
+    if args.target == 'mock':
+        target = MockTarget(workers=args.mock_workers, overload=args.mock_overload)
+    else:
+        target = TARGETS[args.target]()
+    mix = TrafficMix(seed=args.seed)
+
+    if args.find_knee:
+        report = find_knee(target, mix, args.slo_p99, step_duration=args.duration, seed=args.seed)
+    else:
+        if args.mode == 'open':
+            samples = run_open_loop(target, mix, args.rate, args.duration, seed=args.seed)
+        else:
+            samples = run_closed_loop(target, mix, args.concurrency, args.duration)
+        report = summarize(samples, args.duration, args.window)
+        report.update({'target': args.target, 'mode': args.mode})
+        if getattr(target, 'controller', None) is not None:
+            report['overload'] = target.controller.get_metrics()
+
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Latency-Aware Model Cascade
+Picks an IndicTrans2 checkpoint per request from the content class, input
+length, the caller's latency budget and the live queue state of each model,
+and escalates low-confidence output from a smaller checkpoint to a larger
+one when the budget allows.
+
+Content classes:
+    ui:      labels and short UI strings, smallest model, never escalated
+    alert:   alert text; long alerts start on the largest model
+    default: everything else, smallest model with escalation
+"""
+
+import time
+import threading
+import logging
+from collections import deque
+from typing import List, Dict, Optional, Any
+
+from model_pool import ModelPool
+
+logger = logging.getLogger(__name__)
+
+CLASS_UI = 'ui'
+CLASS_ALERT = 'alert'
+CLASS_DEFAULT = 'default'
+
+
+class CascadeLevel:
+    """One checkpoint of the cascade and its latency record"""
+
+    def __init__(self, pool: ModelPool, window: int = 1000):
+        self.pool = pool
+        self.seconds_per_char = 0.0
+        self.requests = 0
+        self.texts = 0
+        self.escalated_in = 0
+        self.latencies: deque = deque(maxlen=window)
+
+    @property
+    def name(self) -> str:
+        """Model currently serving this level, which follows swaps of its pool"""
+        spec = self.pool.active_spec
+        return spec[0] if spec else 'unloaded'
+
+
+class ModelCascade:
+    """
+    Routes requests across checkpoints ordered from smallest to largest
+
+    A level's expected latency is its model's estimated queue wait plus a
+    moving average of service seconds per input character. A request starts
+    on the smallest level, or on the largest for alerts of at least
+    `long_text_chars`, and is moved down a level while the expected latency
+    exceeds its budget. Generated texts whose mean token log-probability
+    falls below `escalate_below` are retried one level up when the
+    remaining budget covers that level's expected latency. The larger
+    level's cached answer is served ahead of the smaller one's, so a text
+    stays escalated when it is requested again.
+
+    Larger levels can be added with add_level() once their models have
+    loaded; until then requests are served by the levels already present.
+    """
+
+    def __init__(self, levels: List[ModelPool], long_text_chars: int = 200,
+                 escalate_below: float = -1.0, ewma_alpha: float = 0.2):
+        if not levels:
+            raise ValueError("A cascade needs at least one model")
+        self.levels = [CascadeLevel(pool) for pool in levels]
+        self.long_text_chars = long_text_chars
+        self.escalate_below = escalate_below
+        self.ewma_alpha = ewma_alpha
+        self._lock = threading.Lock()
+
+    def add_level(self, pool: ModelPool) -> None:
+        """Append a started pool as the new largest level"""
+        with self._lock:
+            # Replaced rather than appended to, so a request in flight keeps a consistent list
+            self.levels = self.levels + [CascadeLevel(pool)]
+
+    def expected_latency(self, level: CascadeLevel, chars: int) -> float:
+        """Queue wait plus service time expected for `chars` input characters"""
+        with level.pool.acquire() as service:
+            wait = service.overload.estimated_wait()
+        return wait + level.seconds_per_char * chars
+
+    def choose_level(self, texts: List[str], content_class: str = CLASS_DEFAULT,
+                     latency_budget: Optional[float] = None) -> int:
+        """Index of the level a request starts on"""
+        chars = sum(len(text) for text in texts)
+        top = len(self.levels) - 1
+        if content_class == CLASS_ALERT and max((len(t) for t in texts), default=0) >= self.long_text_chars:
+            index = top
+        else:
+            index = 0
+
+        if latency_budget is not None:
+            while index > 0 and self.expected_latency(self.levels[index], chars) > latency_budget:
+                index -= 1
+        return index
+
+    def _run(self, level: CascadeLevel, texts: List[str], target_lang: str,
+             priority: str) -> List[Dict[str, Any]]:
+        start = time.perf_counter()
+        with level.pool.acquire() as service:
+            wait = service.overload.estimated_wait()
+            results = service.translate(texts, target_lang, priority)
+        elapsed = time.perf_counter() - start
+
+        chars = sum(len(text) for text in texts)
+        generated = any(r['tier'] not in ('hit', 'cache', 'passthrough') for r in results)
+        self._record(level, len(texts), elapsed)
+        with self._lock:
+            if generated and chars:
+                per_char = max(elapsed - wait, 0.0) / chars
+                if level.seconds_per_char == 0.0:
+                    level.seconds_per_char = per_char
+                else:
+                    level.seconds_per_char += self.ewma_alpha * (per_char - level.seconds_per_char)
+        return results
+
+    def _record(self, level: CascadeLevel, count: int, elapsed: float) -> None:
+        with self._lock:
+            level.requests += 1
+            level.texts += count
+            level.latencies.append(elapsed)
+
+    def _escalated_hits(self, upper: CascadeLevel, texts: List[str],
+                        target_lang: str) -> List[Optional[str]]:
+        """
+        Cached answers of the next level up, which replace the smaller
+        model's cached answer for texts that were escalated before
+        """
+        with upper.pool.acquire() as service:
+            scope = service.model_revision
+            return [service.cache.peek(text, target_lang, scope=scope) for text in texts]
+
+    def translate(self, texts: List[str], target_lang: str, content_class: str = CLASS_DEFAULT,
+                  latency_budget: Optional[float] = None,
+                  priority: str = 'interactive') -> List[Dict[str, Any]]:
+        """
+        Translate texts on the chosen level, escalating low-confidence output
+
+        Each result carries 'model' and 'escalated' in addition to the
+        fields returned by IndicTrans2Service.translate.
+        """
+        start = time.perf_counter()
+        index = self.choose_level(texts, content_class, latency_budget)
+        levels = self.levels
+        level = levels[index]
+        escalates = content_class != CLASS_UI and index < len(levels) - 1
+        upper = levels[index + 1] if escalates else None
+
+        results: List[Optional[Dict[str, Any]]] = [None] * len(texts)
+        hits = 0
+        if upper is not None:
+            for i, translation in enumerate(self._escalated_hits(upper, texts, target_lang)):
+                if translation is not None:
+                    results[i] = {'translated': translation, 'tier': 'hit', 'degraded': False,
+                                  'model': upper.name, 'escalated': True}
+                    hits += 1
+
+        todo = [i for i, result in enumerate(results) if result is None]
+        if todo:
+            for i, result in zip(todo, self._run(level, [texts[i] for i in todo], target_lang, priority)):
+                result['model'] = level.name
+                result['escalated'] = False
+                results[i] = result
+            if upper is not None:
+                self._escalate(upper, texts, todo, results, target_lang, priority,
+                               latency_budget, start)
+
+        if hits:
+            # Texts answered from the larger level's cache count as its traffic
+            self._record(upper, hits, time.perf_counter() - start)
+        return results
+
+    def _escalate(self, upper: CascadeLevel, texts: List[str], todo: List[int],
+                  results: List[Dict[str, Any]], target_lang: str, priority: str,
+                  latency_budget: Optional[float], start: float) -> None:
+        """Retry low-confidence results in `todo` on the next level up, in place"""
+        low = [i for i in todo
+               if results[i].get('score') is not None and results[i]['score'] < self.escalate_below]
+        if not low:
+            return
+
+        retry = [texts[i] for i in low]
+        if latency_budget is not None:
+            remaining = latency_budget - (time.perf_counter() - start)
+            if self.expected_latency(upper, sum(len(t) for t in retry)) > remaining:
+                return
+
+        escalated = self._run(upper, retry, target_lang, priority)
+        with self._lock:
+            upper.escalated_in += len(retry)
+        for i, result in zip(low, escalated):
+            if result['degraded']:
+                continue  # keep the smaller model's answer over a degraded one
+            result['model'] = upper.name
+            result['escalated'] = True
+            results[i] = result
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Traffic share and latency of each model"""
+        with self._lock:
+            # Labelled by the model each pool serves now, not the one it started with
+            total = sum(level.texts for level in self.levels) or 1
+            stats = {}
+            for level in self.levels:
+                latencies = sorted(level.latencies)
+                entry = {
+                    'requests': level.requests,
+                    'texts': level.texts,
+                    'share': round(level.texts / total, 4),
+                    'escalated_in': level.escalated_in,
+                    'seconds_per_char': round(level.seconds_per_char, 6),
+                }
+                if latencies:
+                    entry['p50'] = round(latencies[len(latencies) // 2], 4)
+                    entry['p95'] = round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))], 4)
+                    entry['p99'] = round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))], 4)
+                stats[level.name] = entry
+            return stats
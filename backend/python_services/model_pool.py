@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Model Pool for Zero-Downtime Model Swaps
+Loads a new model version or backend next to the serving one, warms it
+with a replay of recent real inputs, switches traffic over atomically and
+frees the old model once its in-flight requests have finished.
+"""
+
+import time
+import threading
+import logging
+from collections import deque
+from contextlib import contextmanager
+from typing import List, Dict, Tuple, Callable, Optional, Any
+
+logger = logging.getLogger(__name__)
+
+STATE_IDLE = 'idle'
+STATE_LOADING = 'loading'
+STATE_WARMING = 'warming'
+STATE_DRAINING = 'draining'
+
+# (model_name, revision)
+ModelSpec = Tuple[str, str]
+
+
+class ModelReplica:
+    """A loaded model and the number of requests currently using it"""
+
+    def __init__(self, spec: ModelSpec, service: Any):
+        self.spec = spec
+        self.service = service
+        self.inflight = 0
+        self.loaded_at = time.time()
+
+
+class ModelPool:
+    """
+    Serves requests from one active replica while another is swapped in
+
+    `loader(model_name, revision)` returns a service object with:
+        warm(samples)  run a list of (texts, target_lang) samples
+        unload()       release the model's memory
+
+    Requests take the active replica with acquire(); the swap only replaces
+    the pointer under the pool lock, so a request sees either the old or
+    the new model for its whole duration, never a mix. Replay batches are
+    kept small because each one occupies the model next to live traffic.
+    `on_state(state)` is called on every state change.
+    """
+
+    def __init__(self, loader: Callable[[str, str], Any], replay_size: int = 200,
+                 warm_batch_size: int = 4, on_state: Optional[Callable[[str], None]] = None):
+        self.loader = loader
+        self.warm_batch_size = warm_batch_size
+        self.on_state = on_state
+        self.state = STATE_IDLE
+
+        self._lock = threading.Lock()
+        self._drained = threading.Condition(self._lock)
+        self._swap_lock = threading.Lock()
+        self._active: Optional[ModelReplica] = None
+        self._standby: Optional[ModelReplica] = None
+        self._previous_spec: Optional[ModelSpec] = None
+        self._recent: deque = deque(maxlen=replay_size)
+        self.swaps = 0
+        self.last_swap: Optional[Dict[str, Any]] = None
+
+    def _set_state(self, state: str) -> None:
+        self.state = state
+        if self.on_state is not None:
+            self.on_state(state)
+
+    def start(self, model_name: str, revision: str) -> None:
+        """Load the first replica synchronously"""
+        with self._swap_lock:
+            self._set_state(STATE_LOADING)
+            try:
+                replica = ModelReplica((model_name, revision), self.loader(model_name, revision))
+            finally:
+                self._set_state(STATE_IDLE)
+            with self._lock:
+                self._active = replica
+
+    @property
+    def active_spec(self) -> Optional[ModelSpec]:
+        with self._lock:
+            return self._active.spec if self._active else None
+
+    @contextmanager
+    def acquire(self):
+        """Use the active replica's service for the duration of one request"""
+        with self._lock:
+            replica = self._active
+            if replica is None:
+                raise RuntimeError("Model pool has not been started")
+            replica.inflight += 1
+        try:
+            yield replica.service
+        finally:
+            with self._lock:
+                replica.inflight -= 1
+                if replica.inflight == 0:
+                    self._drained.notify_all()
+
+    def record(self, texts: List[str], target_lang: str) -> None:
+        """Remember a real input for warming the next replica"""
+        self._recent.append((list(texts), target_lang))
+
+    def _warm_samples(self) -> List[Tuple[List[str], str]]:
+        """Recent inputs regrouped into per-language batches"""
+        by_lang: Dict[str, List[str]] = {}
+        for texts, lang in list(self._recent):
+            by_lang.setdefault(lang, []).extend(texts)
+        samples = []
+        for lang, texts in by_lang.items():
+            unique = list(dict.fromkeys(texts))
+            for i in range(0, len(unique), self.warm_batch_size):
+                samples.append((unique[i:i + self.warm_batch_size], lang))
+        return samples
+
+    def _drain_and_free(self, replica: ModelReplica, keep: bool) -> None:
+        self._set_state(STATE_DRAINING)
+        with self._lock:
+            while replica.inflight:
+                if not self._drained.wait(timeout=5.0):
+                    logger.info(f"Waiting for {replica.inflight} request(s) on {replica.spec} to finish")
+        if keep:
+            with self._lock:
+                previous, self._standby = self._standby, replica
+            if previous is not None:
+                previous.service.unload()
+        else:
+            replica.service.unload()
+        logger.info(f"Retired model {replica.spec[0]}@{replica.spec[1]}")
+
+    def _swap(self, spec: ModelSpec, warm: bool, keep_previous: bool) -> None:
+        with self._swap_lock:
+            started = time.perf_counter()
+            try:
+                with self._lock:
+                    standby, self._standby = self._standby, None
+                if standby is not None and standby.spec != spec:
+                    # Free it before loading, so at most two models are ever resident
+                    logger.info(f"Unloading standby {standby.spec[0]}@{standby.spec[1]}")
+                    standby.service.unload()
+                    standby = None
+
+                if standby is not None:
+                    replica = standby
+                else:
+                    self._set_state(STATE_LOADING)
+                    logger.info(f"Loading model {spec[0]}@{spec[1]} alongside the active one")
+                    replica = ModelReplica(spec, self.loader(*spec))
+
+                    if warm:
+                        self._set_state(STATE_WARMING)
+                        samples = self._warm_samples()
+                        replica.service.warm(samples)
+                        logger.info(f"Warmed {spec[0]}@{spec[1]} with {len(samples)} replayed batch(es)")
+
+                with self._lock:
+                    old, self._active = self._active, replica
+                    self._previous_spec = old.spec if old else None
+                    self.swaps += 1
+                logger.info(f"Switched traffic to {spec[0]}@{spec[1]}")
+
+                if old is not None:
+                    self._drain_and_free(old, keep_previous)
+
+                self.last_swap = {
+                    'spec': list(spec),
+                    'seconds': round(time.perf_counter() - started, 3),
+                    'from_standby': standby is not None,
+                }
+            except Exception as e:
+                logger.error(f"Model swap to {spec[0]}@{spec[1]} failed, keeping the active model: {e}")
+                self.last_swap = {'spec': list(spec), 'error': str(e)}
+                raise
+            finally:
+                self._set_state(STATE_IDLE)
+
+    def swap(self, model_name: str, revision: str, warm: bool = True, keep_previous: bool = False,
+             background: bool = True) -> Optional[threading.Thread]:
+        """
+        Replace the active model with (model_name, revision)
+
+        With keep_previous the old replica stays loaded after draining, so a
+        rollback is instant. A standby kept from an earlier swap is reused when
+        it matches the requested model and unloaded otherwise. Runs in a
+        background thread unless `background` is False. A failed load or
+        warm-up leaves the active model in place.
+        """
+        spec = (model_name, revision)
+        if not background:
+            self._swap(spec, warm, keep_previous)
+            return None
+
+        def run():
+            try:
+                self._swap(spec, warm, keep_previous)
+            except Exception:
+                pass  # already logged and recorded in last_swap
+
+        thread = threading.Thread(target=run, name='model-swap', daemon=True)
+        thread.start()
+        return thread
+
+    def rollback(self, background: bool = True, **kwargs) -> Optional[threading.Thread]:
+        """Swap back to the previously active model"""
+        with self._lock:
+            spec = self._previous_spec
+        if spec is None:
+            raise RuntimeError("No previous model to roll back to")
+        return self.swap(*spec, background=background, **kwargs)
+
+    def get_status(self) -> Dict[str, Any]:
+        with self._lock:
+            active = self._active
+            return {
+                'state': self.state,
+                'active': list(active.spec) if active else None,
+                'inflight': active.inflight if active else 0,
+                'standby': list(self._standby.spec) if self._standby else None,
+                'previous': list(self._previous_spec) if self._previous_spec else None,
+                'swaps': self.swaps,
+                'last_swap': self.last_swap,
+                'replay_inputs': len(self._recent),
+            }
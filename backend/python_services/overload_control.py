@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Overload Control for the Translation Service
+Tracks queue wait in front of the model and steps requests down through
+cheaper service tiers instead of letting them queue into the Node timeout
+
+Tiers, from most to least expensive:
+    full:        beam search generation
+    greedy:      greedy generation (num_beams=1)
+    cache:       cache, phrase table or near match only, no model call
+    passthrough: untranslated original, marked degraded
+"""
+
+import math
+import time
+import threading
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, Optional, Any
+
+TIER_FULL = 'full'
+TIER_GREEDY = 'greedy'
+TIER_CACHE = 'cache'
+TIER_PASSTHROUGH = 'passthrough'
+
+TIERS = (TIER_FULL, TIER_GREEDY, TIER_CACHE, TIER_PASSTHROUGH)
+
+# Tiers whose answers are flagged `degraded: true`
+DEGRADED_TIERS = (TIER_CACHE, TIER_PASSTHROUGH)
+
+# Maximum time (seconds) a request of each priority may spend waiting for the model
+DEFAULT_BUDGETS = {
+    'interactive': 2.0,
+    'batch': 25.0,  # stays under the Node bridge's 30 s timeout
+    'refresh': math.inf,  # offline retranslation waits for the model and is never shed
+}
+
+
+class OverloadController:
+    """
+    Admission control in front of a fixed number of model slots
+
+    The expected queue wait is estimated from the number of requests ahead
+    and a moving average of service time, and also from a moving average of
+    observed waits that decays while the model is idle. The tier is chosen
+    by comparing that estimate with the request's budget:
+
+        wait < greedy_fraction * budget  -> full
+        wait < cache_fraction * budget   -> greedy
+        wait < budget                    -> cache
+        otherwise                        -> passthrough
+
+    A request that goes on to wait for a slot gives up when its budget runs
+    out, so interactive callers are answered within their budget plus one
+    generation regardless of load.
+    """
+
+    def __init__(self, slots: int = 1, budgets: Optional[Dict[str, float]] = None,
+                 greedy_fraction: float = 0.25, cache_fraction: float = 0.5,
+                 ewma_alpha: float = 0.2, decay_seconds: float = 5.0):
+        self.slots = slots
+        self.budgets = dict(budgets or DEFAULT_BUDGETS)
+        self.greedy_fraction = greedy_fraction
+        self.cache_fraction = cache_fraction
+        self.ewma_alpha = ewma_alpha
+        self.decay_seconds = decay_seconds
+
+        self._semaphore = threading.Semaphore(slots)
+        self._lock = threading.Lock()
+        self._waiting = 0
+        self._active = 0
+        self._service_ewma = 0.0
+        self._wait_ewma = 0.0
+        self._wait_updated = time.monotonic()
+        self._recent_waits = deque(maxlen=1000)
+
+        self.tier_counts = {priority: {tier: 0 for tier in TIERS} for priority in self.budgets}
+        self.slot_timeouts = 0
+        # Tier counters for labelled periods, e.g. 'swap' while a new model is deployed
+        self.phase: Optional[str] = None
+        self.phase_counts: Dict[str, Dict[str, int]] = {}
+
+    @property
+    def waiting(self) -> int:
+        """Requests currently queued for a slot"""
+        return self._waiting
+
+    def set_phase(self, phase: Optional[str]) -> None:
+        """Also count the following requests under `phase` (None ends it)"""
+        with self._lock:
+            self.phase = phase
+
+    def budget(self, priority: str) -> float:
+        return self.budgets.get(priority, self.budgets['interactive'])
+
+    def estimated_wait(self) -> float:
+        """Expected seconds a new request would wait for a model slot"""
+        with self._lock:
+            # Requests in service are on average half done
+            ahead = self._waiting + 0.5 * self._active
+            predicted = ahead * self._service_ewma / self.slots
+            age = time.monotonic() - self._wait_updated
+            observed = self._wait_ewma * math.exp(-age / self.decay_seconds)
+        return max(predicted, observed)
+
+    def choose_tier(self, priority: str = 'interactive') -> str:
+        """Pick the most expensive tier the current load allows"""
+        budget = self.budget(priority)
+        wait = self.estimated_wait()
+        if wait >= budget:
+            return TIER_PASSTHROUGH
+        if wait >= self.cache_fraction * budget:
+            return TIER_CACHE
+        if wait >= self.greedy_fraction * budget:
+            return TIER_GREEDY
+        return TIER_FULL
+
+    def record(self, priority: str, tier: str, count: int = 1) -> None:
+        """Count requests answered at a tier"""
+        with self._lock:
+            counts = self.tier_counts.setdefault(priority, {t: 0 for t in TIERS})
+            counts[tier] += count
+            if self.phase is not None:
+                counts = self.phase_counts.setdefault(self.phase, {t: 0 for t in TIERS})
+                counts[tier] += count
+
+    @contextmanager
+    def slot(self, timeout: Optional[float] = None):
+        """
+        Wait up to `timeout` seconds for a model slot
+
+        Yields True when the slot was acquired and False when the wait timed
+        out; the caller then falls back to a cheaper tier.
+        """
+        with self._lock:
+            self._waiting += 1
+        start = time.monotonic()
+        if timeout is not None and math.isinf(timeout):
+            timeout = None
+        acquired = self._semaphore.acquire(timeout=max(timeout, 0.0) if timeout is not None else None)
+        waited = time.monotonic() - start
+
+        with self._lock:
+            self._waiting -= 1
+            self._observe_wait(waited)
+            if acquired:
+                self._active += 1
+            else:
+                self.slot_timeouts += 1
+
+        if not acquired:
+            yield False
+            return
+
+        try:
+            yield True
+        finally:
+            service = time.monotonic() - start - waited
+            with self._lock:
+                self._active -= 1
+                if self._service_ewma == 0.0:
+                    self._service_ewma = service
+                else:
+                    self._service_ewma += self.ewma_alpha * (service - self._service_ewma)
+            self._semaphore.release()
+
+    def _observe_wait(self, waited: float) -> None:
+        now = time.monotonic()
+        decayed = self._wait_ewma * math.exp(-(now - self._wait_updated) / self.decay_seconds)
+        self._wait_ewma = decayed + self.ewma_alpha * (waited - decayed)
+        self._wait_updated = now
+        self._recent_waits.append(waited)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Tier counters and queue state"""
+        estimated = self.estimated_wait()
+        with self._lock:
+            waits = sorted(self._recent_waits)
+            tier_counts = {p: dict(c) for p, c in self.tier_counts.items()}
+            metrics = {
+                'tiers': tier_counts,
+                'degraded': sum(c[t] for c in tier_counts.values() for t in DEGRADED_TIERS),
+                'phases': {
+                    phase: dict(counts, degraded=sum(counts[t] for t in DEGRADED_TIERS))
+                    for phase, counts in self.phase_counts.items()
+                },
+                'slot_timeouts': self.slot_timeouts,
+                'waiting': self._waiting,
+                'active': self._active,
+                'estimated_wait': round(estimated, 4),
+                'service_time_ewma': round(self._service_ewma, 4),
+            }
+        if waits:
+            metrics['wait_p50'] = round(waits[len(waits) // 2], 4)
+            metrics['wait_p99'] = round(waits[min(len(waits) - 1, int(len(waits) * 0.99))], 4)
+        return metrics
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Pivot Router for Indic-to-Indic Translation
+Routes each Indic->Indic pair either to the direct model or through an
+English pivot, based on measured per-item latency. On the pivot route the
+English intermediate is computed once, cached, and fanned out to every
+target language, so rebroadcasting an alert to several states decodes the
+source side only once.
+"""
+
+import time
+import threading
+import logging
+from typing import List, Dict, Tuple, Callable, Optional, Any
+
+from translation_cache import TranslationCache
+
+logger = logging.getLogger(__name__)
+
+PIVOT_LANG = 'eng_Latn'
+
+ROUTE_DIRECT = 'direct'
+ROUTE_PIVOT = 'pivot'
+
+# translate_fn(texts, src_lang, tgt_lang) -> translations, IndicTrans2 language tags
+TranslateFn = Callable[[List[str], str, str], List[str]]
+
+
+class PivotRouter:
+    """
+    Chooses between direct and pivot routes per language pair
+
+    Per-item latency is tracked as a moving average for every direct pair
+    and every pivot leg (src->en, en->tgt). For a fan-out to k targets the
+    pivot cost of one target is cost(src->en) / k + cost(en->tgt), with the
+    source leg dropping to zero when the English is already cached. Routes
+    without a measurement are tried first, except that an unmeasured fan-out
+    to several targets starts on the pivot, since that is one source decode
+    instead of k even in a short-lived process. Every `explore_every`
+    decisions the losing route is re-measured so the choice tracks load.
+    """
+
+    def __init__(self, translate_fn: TranslateFn, cache: Optional[TranslationCache] = None,
+                 direct_available: Optional[Callable[[str, str], bool]] = None,
+                 explore_every: int = 50, ewma_alpha: float = 0.2):
+        self.translate_fn = translate_fn
+        self.cache = cache or TranslationCache(maxsize=5000)
+        self.direct_available = direct_available or (lambda src, tgt: True)
+        self.explore_every = explore_every
+        self.ewma_alpha = ewma_alpha
+
+        self._lock = threading.Lock()
+        self._latency: Dict[Tuple[str, str, str], float] = {}
+        self._decisions: Dict[Tuple[str, str], int] = {}
+        self.route_counts = {ROUTE_DIRECT: 0, ROUTE_PIVOT: 0}
+        self.pivot_cache_hits = 0
+
+    @staticmethod
+    def needs_routing(src_lang: str, tgt_lang: str) -> bool:
+        """Only Indic->Indic pairs have a choice of route"""
+        return src_lang != PIVOT_LANG and tgt_lang != PIVOT_LANG and src_lang != tgt_lang
+
+    def _observe(self, key: Tuple[str, str, str], seconds: float, items: int) -> None:
+        per_item = seconds / max(items, 1)
+        with self._lock:
+            previous = self._latency.get(key)
+            if previous is None:
+                self._latency[key] = per_item
+            else:
+                self._latency[key] = previous + self.ewma_alpha * (per_item - previous)
+
+    def _timed(self, key: Tuple[str, str, str], texts: List[str], src: str, tgt: str) -> List[str]:
+        start = time.perf_counter()
+        translations = self.translate_fn(texts, src, tgt)
+        self._observe(key, time.perf_counter() - start, len(texts))
+        return translations
+
+    def choose_route(self, src_lang: str, tgt_lang: str, fanout: int = 1,
+                     pivot_cached: float = 0.0) -> str:
+        """
+        Pick the cheaper route for one target of a fan-out
+
+        `pivot_cached` is the fraction of inputs whose English is already cached.
+        """
+        if not self.direct_available(src_lang, tgt_lang):
+            return ROUTE_PIVOT
+
+        with self._lock:
+            direct = self._latency.get((ROUTE_DIRECT, src_lang, tgt_lang))
+            to_pivot = self._latency.get((ROUTE_PIVOT, src_lang, PIVOT_LANG))
+            from_pivot = self._latency.get((ROUTE_PIVOT, PIVOT_LANG, tgt_lang))
+            pair = (src_lang, tgt_lang)
+            decisions = self._decisions[pair] = self._decisions.get(pair, 0) + 1
+
+        explore = bool(self.explore_every) and decisions % self.explore_every == 0
+        if direct is None:
+            return ROUTE_PIVOT if fanout > 1 and not explore else ROUTE_DIRECT
+        if to_pivot is None or from_pivot is None:
+            return ROUTE_PIVOT
+
+        pivot = to_pivot * (1.0 - pivot_cached) / max(fanout, 1) + from_pivot
+        best, other = (ROUTE_DIRECT, ROUTE_PIVOT) if direct <= pivot else (ROUTE_PIVOT, ROUTE_DIRECT)
+        if explore:
+            return other
+        return best
+
+    def to_pivot(self, texts: List[str], src_lang: str) -> List[str]:
+        """English intermediate for texts, decoding only cache misses in one batch"""
+        cache_lang = f"{src_lang}>{PIVOT_LANG}"
+        english: List[Optional[str]] = [self.cache.get(text, cache_lang) for text in texts]
+        misses = list(dict.fromkeys(t for t, e in zip(texts, english) if e is None))
+        with self._lock:
+            self.pivot_cache_hits += len(texts) - sum(1 for e in english if e is None)
+
+        if misses:
+            translated = dict(zip(misses, self._timed(
+                (ROUTE_PIVOT, src_lang, PIVOT_LANG), misses, src_lang, PIVOT_LANG)))
+            for text, value in translated.items():
+                self.cache.put(text, cache_lang, value)
+            english = [e if e is not None else translated[t] for t, e in zip(texts, english)]
+
+        return english
+
+    def translate_fanout(self, texts: List[str], src_lang: str,
+                         tgt_langs: List[str]) -> Tuple[Dict[str, List[str]], Dict[str, str]]:
+        """
+        Translate texts into every target language
+
+        Returns ({tgt_lang: translations}, {tgt_lang: route})
+        """
+        results: Dict[str, List[str]] = {}
+        routes: Dict[str, str] = {}
+        routed = [tgt for tgt in tgt_langs if self.needs_routing(src_lang, tgt)]
+
+        cache_lang = f"{src_lang}>{PIVOT_LANG}"
+        cached = sum(1 for text in texts if self.cache.peek(text, cache_lang) is not None)
+        pivot_cached = cached / len(texts) if texts else 1.0
+
+        for tgt in tgt_langs:
+            if tgt == src_lang:
+                results[tgt], routes[tgt] = list(texts), ROUTE_DIRECT
+            elif tgt in routed:
+                routes[tgt] = self.choose_route(src_lang, tgt, len(routed), pivot_cached)
+            elif tgt == PIVOT_LANG:
+                # Shares the cached intermediate with the pivot targets
+                results[tgt], routes[tgt] = self.to_pivot(texts, src_lang), ROUTE_DIRECT
+            else:
+                results[tgt] = self.translate_fn(texts, src_lang, tgt)
+                routes[tgt] = ROUTE_DIRECT
+
+        pivot_targets = [tgt for tgt in routed if routes[tgt] == ROUTE_PIVOT]
+        english = self.to_pivot(texts, src_lang) if pivot_targets else None
+
+        for tgt in routed:
+            if routes[tgt] == ROUTE_PIVOT:
+                results[tgt] = self._timed((ROUTE_PIVOT, PIVOT_LANG, tgt), english, PIVOT_LANG, tgt)
+            else:
+                results[tgt] = self._timed((ROUTE_DIRECT, src_lang, tgt), texts, src_lang, tgt)
+            with self._lock:
+                self.route_counts[routes[tgt]] += 1
+
+        return results, routes
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Route counters and per-item latency estimates"""
+        with self._lock:
+            return {
+                'routes': dict(self.route_counts),
+                'pivot_cache_hits': self.pivot_cache_hits,
+                'latency_per_item': {
+                    f"{route}:{src}->{tgt}": round(seconds, 4)
+                    for (route, src, tgt), seconds in sorted(self._latency.items())
+                },
+            }
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Tests for the binary bridge protocol (no model needed)
+
+Usage:
+    python test_bridge_protocol.py
+"""
+
+import io
+import sys
+import json
+import unittest
+import subprocess
+from pathlib import Path
+
+from bridge_protocol import (
+    BridgeServer, BridgeClient, ProtocolError,
+    encode_string_table, decode_string_table, pack_message, unpack_message,
+    read_frame, write_frame, string_table_size, create_shared_batch, read_shared_batch,
+    FRAME_REQUEST, HEADER,
+)
+
+
+class EchoService:
+    """Uppercases texts and reports every other one as degraded"""
+
+    def translate_batch(self, texts, src_lang, tgt_lang):
+        return [{
+            'success': True,
+            'original': text,
+            'translated': text.upper(),
+            'source_language': src_lang,
+            'target_language': tgt_lang,
+            'degraded': i % 2 == 1,
+        } for i, text in enumerate(texts)]
+
+    def get_supported_languages(self):
+        return ['en', 'hi']
+
+
+class Worker:
+    """Echo worker in a child process, as the real worker runs, behind a BridgeClient"""
+
+    def __init__(self, shm_threshold):
+        self.process = subprocess.Popen(
+            [sys.executable, __file__, '--serve-echo', str(shm_threshold)],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, cwd=Path(__file__).parent)
+        self.client = BridgeClient(self.process.stdout, self.process.stdin, shm_threshold)
+
+    def close(self):
+        self.process.stdin.close()
+        self.process.wait(timeout=10)
+        self.process.stdout.close()
+
+
+class FramingTest(unittest.TestCase):
+
+    def test_string_table_round_trip(self):
+        texts = ['', 'Hello', 'नमस्ते संसार', 'పశువుల సంఖ్య', 'x' * 1000]
+        table = encode_string_table(texts)
+        self.assertEqual(decode_string_table(table), texts)
+        self.assertEqual(len(table), string_table_size(texts)[1])
+
+    def test_message_round_trip(self):
+        meta = {'op': 'translate', 'src_lang': 'en', 'tgt_lang': 'hi', 'note': 'पशु'}
+        self.assertEqual(unpack_message(pack_message(meta, ['a', 'बी'])), (meta, ['a', 'बी']))
+        self.assertEqual(unpack_message(pack_message({'op': 'ping'})), ({'op': 'ping'}, []))
+
+    def test_frames_on_a_stream(self):
+        stream = io.BytesIO()
+        write_frame(stream, FRAME_REQUEST, 7, b'abc')
+        write_frame(stream, FRAME_REQUEST, 8, b'')
+        stream.seek(0)
+        self.assertEqual(read_frame(stream), (FRAME_REQUEST, 7, b'abc'))
+        self.assertEqual(read_frame(stream), (FRAME_REQUEST, 8, b''))
+        self.assertIsNone(read_frame(stream))
+
+    def test_bad_and_truncated_frames(self):
+        with self.assertRaises(ProtocolError):
+            read_frame(io.BytesIO(b'XX' + bytes(HEADER.size - 2)))
+        stream = io.BytesIO()
+        write_frame(stream, FRAME_REQUEST, 1, b'abcdef')
+        with self.assertRaises(ProtocolError):
+            read_frame(io.BytesIO(stream.getvalue()[:-2]))
+
+    def test_shared_batch_round_trip(self):
+        texts = ['पशु'] * 100
+        shm, size = create_shared_batch(texts)
+        try:
+            self.assertEqual(size, string_table_size(texts)[1])
+            self.assertEqual(read_shared_batch(shm.name, unlink=True), texts)
+        finally:
+            shm.close()
+
+
+class BridgeTest(unittest.TestCase):
+
+    def start(self, shm_threshold=1024):
+        worker = Worker(shm_threshold)
+        self.addCleanup(worker.close)
+        return worker.client
+
+    def test_inline_translate(self):
+        client = self.start()
+        meta, translations = client.translate(['hello', 'world'], 'en', 'hi')
+        self.assertTrue(meta['success'])
+        self.assertEqual(meta['degraded'], [False, True])
+        self.assertEqual(translations, ['HELLO', 'WORLD'])
+
+    def test_shared_memory_translate(self):
+        client = self.start()
+        texts = [f'line {i}' for i in range(500)]
+        meta, translations = client.translate(texts, 'en', 'hi')
+        self.assertIn('shm', meta)
+        self.assertEqual(translations, [text.upper() for text in texts])
+
+    def test_indic_text_uses_shared_memory_by_bytes(self):
+        # 400 characters but 1200 UTF-8 bytes, above the 1024 byte threshold
+        client = self.start()
+        meta, translations = client.translate(['पशु' * 133 + 'प'], 'hi', 'en')
+        self.assertIn('shm', meta)
+        self.assertEqual(len(translations), 1)
+
+    def test_ops_and_errors(self):
+        client = self.start()
+        self.assertEqual(client.request({'op': 'ping'}), ({'success': True}, []))
+        meta, _ = client.request({'op': 'languages'})
+        self.assertEqual(meta['languages'], ['en', 'hi'])
+        meta, _ = client.request({'op': 'swap_model'})
+        self.assertFalse(meta['success'])
+        meta, _ = client.request({'op': 'nope'})
+        self.assertEqual(meta, {'success': False, 'error': 'Unknown op: nope'})
+
+    def test_jsonl_mode(self):
+        instream = io.StringIO(json.dumps({'id': 3, 'texts': ['a', 'b']}) + '\n\n'
+                               + json.dumps({'id': 4, 'op': 'ping'}) + '\n')
+        outstream = io.StringIO()
+        BridgeServer(EchoService()).serve_jsonl(instream, outstream)
+        first, second = [json.loads(line) for line in outstream.getvalue().splitlines()]
+        self.assertEqual((first['id'], first['translated']), (3, ['A', 'B']))
+        self.assertEqual((second['id'], second['success']), (4, True))
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 2 and sys.argv[1] == '--serve-echo':
+        BridgeServer(EchoService(), int(sys.argv[2])).serve_binary(sys.stdin.buffer, sys.stdout.buffer)
+    else:
+        unittest.main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Tests for the content manifest (no model needed)
+
+Usage:
+    python test_content_manifest.py
+"""
+
+import unittest
+
+from content_manifest import ManifestStore, split_segments, join_segments, segment_hash
+
+
+def upper(texts, lang):
+    return [text.upper() for text in texts]
+
+
+class RecordingEngine:
+    """Uppercases texts and remembers what it was asked to translate"""
+
+    def __init__(self, skip=()):
+        self.calls = []
+        self.skip = set(skip)
+
+    def __call__(self, texts, lang):
+        self.calls.extend(texts)
+        return [None if text in self.skip else text.upper() for text in texts]
+
+
+class ContentManifestTest(unittest.TestCase):
+
+    def setUp(self):
+        self.store = ManifestStore(':memory:')
+
+    def tearDown(self):
+        self.store.close()
+
+    def rows(self, content_id, lang='hi'):
+        return self.store.conn.execute(
+            'SELECT idx, translation, model_revision FROM segments '
+            'WHERE content_id = ? AND lang = ? ORDER BY idx', (content_id, lang)
+        ).fetchall()
+
+    def test_segments_round_trip(self):
+        text = 'First line.\nSecond one!  Third।  Last'
+        segments, separators = split_segments(text)
+        self.assertEqual(len(segments), 4)
+        self.assertEqual(join_segments(segments, separators), text)
+
+    def test_hash_ignores_normalization_form(self):
+        self.assertEqual(segment_hash('क़'), segment_hash('क़'))
+
+    def test_unchanged_corpus_is_not_retranslated(self):
+        corpus = {'a': 'One. Two.', 'b': 'Three.'}
+        results, summary = self.store.refresh(corpus, ['hi', 'te'], 'r1', upper)
+        self.assertEqual(summary['translated'], 6)
+        self.assertEqual(results['a']['hi'], 'ONE. TWO.')
+
+        engine = RecordingEngine()
+        results, summary = self.store.refresh(corpus, ['hi', 'te'], 'r1', engine)
+        self.assertEqual(engine.calls, [])
+        self.assertEqual(summary['unchanged'], 6)
+        self.assertEqual(results['b']['te'], 'THREE.')
+
+    def test_only_changed_segment_is_sent(self):
+        self.store.refresh({'a': 'One. Two. Three.'}, ['hi'], 'r1', upper)
+        engine = RecordingEngine()
+        results, summary = self.store.refresh({'a': 'One. Deux. Three.'}, ['hi'], 'r1', engine)
+        self.assertEqual(engine.calls, ['Deux.'])
+        self.assertEqual(summary['changed'], 1)
+        self.assertEqual(results['a']['hi'], 'ONE. DEUX. THREE.')
+
+    def test_new_revision_marks_segments_stale(self):
+        self.store.refresh({'a': 'One. Two.'}, ['hi'], 'r1', upper)
+        engine = RecordingEngine()
+        _, summary = self.store.refresh({'a': 'One. Two.'}, ['hi'], 'r2', engine)
+        self.assertEqual(summary['stale'], 2)
+        self.assertEqual(sorted(engine.calls), ['One.', 'Two.'])
+        self.assertEqual({rev for _, _, rev in self.rows('a')}, {'r2'})
+
+    def test_moved_segment_is_reused(self):
+        self.store.refresh({'a': 'One. Two.'}, ['hi'], 'r1', upper)
+        engine = RecordingEngine()
+        results, summary = self.store.refresh({'a': 'One. Two.', 'b': 'Two.'}, ['hi'], 'r1', engine)
+        self.assertEqual(engine.calls, [])
+        self.assertEqual(summary['reused'], 1)
+        self.assertEqual(results['b']['hi'], 'TWO.')
+
+    def test_shrunk_item_drops_trailing_segments(self):
+        self.store.refresh({'a': 'One. Two. Three.'}, ['hi'], 'r1', upper)
+        self.store.refresh({'a': 'One.'}, ['hi'], 'r1', upper)
+        self.assertEqual(self.rows('a'), [(0, 'ONE.', 'r1')])
+
+    def test_deferred_segments_are_retried(self):
+        corpus = {'a': 'One. Two.', 'b': 'Three.'}
+        results, summary = self.store.refresh(corpus, ['hi'], 'r1', RecordingEngine(skip=['Two.']))
+        self.assertEqual(summary['deferred'], 1)
+        self.assertNotIn('a', results)
+        self.assertEqual([idx for idx, _, _ in self.rows('a')], [0])
+
+        engine = RecordingEngine()
+        results, summary = self.store.refresh(corpus, ['hi'], 'r1', engine)
+        self.assertEqual(engine.calls, ['Two.'])
+        self.assertEqual(results['a']['hi'], 'ONE. TWO.')
+
+    def test_prune_removes_deleted_content(self):
+        self.store.refresh({'a': 'One.', 'b': 'Two.'}, ['hi'], 'r1', upper)
+        self.assertEqual(self.store.prune(['a']), 1)
+        self.assertEqual(self.rows('b'), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
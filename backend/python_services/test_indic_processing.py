@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Tests for IndicTrans2 pre/post-processing (no model needed)
+
+Usage:
+    python test_indic_processing.py
+"""
+
+import unicodedata
+import unittest
+
+from indic_processing import IndicProcessor, benchmark
+
+
+class PreprocessTest(unittest.TestCase):
+
+    def setUp(self):
+        self.processor = IndicProcessor()
+
+    def pre(self, text, src='eng_Latn', tgt='hin_Deva'):
+        return self.processor.preprocess_batch([text], src, tgt)[0]
+
+    def test_language_tag_prefix(self):
+        self.assertEqual(self.pre('Hello', 'eng_Latn', 'tel_Telu'), 'eng_Latn tel_Telu Hello')
+        self.assertEqual(self.processor.preprocess_batch([], 'eng_Latn', 'hin_Deva'), [])
+
+    def test_whitespace_is_collapsed(self):
+        self.assertEqual(self.pre('  Hello \t\n world  '), 'eng_Latn hin_Deva Hello world')
+
+    def test_punctuation_is_normalized(self):
+        self.assertEqual(self.pre('“Stop” – it’s urgent…'),
+                         'eng_Latn hin_Deva "Stop" - it\'s urgent...')
+        self.assertEqual(self.pre('a b\u200bc'), 'eng_Latn hin_Deva a bc')
+
+    def test_digits_become_ascii(self):
+        self.assertEqual(self.pre('पशु १२', 'hin_Deva', 'eng_Latn'), 'hin_Deva eng_Latn पशु 12')
+        self.assertEqual(self.pre('౧౨ ৩', 'tel_Telu', 'eng_Latn'), 'tel_Telu eng_Latn 12 3')
+
+    def test_script_is_unified_to_devanagari(self):
+        # Telugu KA (U+0C15) maps to Devanagari KA (U+0915)
+        self.assertEqual(self.pre('క', 'tel_Telu', 'hin_Deva'), 'tel_Telu hin_Deva क')
+        # Latin and Devanagari sources are left as they are
+        self.assertEqual(self.pre('క', 'eng_Latn', 'hin_Deva'), 'eng_Latn hin_Deva క')
+
+    def test_zero_width_joiners_are_kept(self):
+        self.assertIn('\u200d', self.pre('क्\u200dष', 'hin_Deva', 'eng_Latn'))
+
+    def test_input_is_nfc_normalized(self):
+        decomposed = unicodedata.normalize('NFD', 'क़')
+        self.assertEqual(self.pre(decomposed, 'hin_Deva', 'eng_Latn'),
+                         'hin_Deva eng_Latn ' + unicodedata.normalize('NFC', 'क़'))
+
+
+class PostprocessTest(unittest.TestCase):
+
+    def setUp(self):
+        self.processor = IndicProcessor()
+
+    def test_special_tokens_and_spacing(self):
+        output = self.processor.postprocess_batch(['<s> पशु , और ( जाँच ) करें । </s> <pad>'], 'hin_Deva')
+        self.assertEqual(output, ['पशु, और (जाँच) करें।'])
+
+    def test_converted_back_to_target_script(self):
+        output = self.processor.postprocess_batch(['क ।'], 'tel_Telu')
+        # Danda is shared by all Brahmic scripts and stays as it is
+        self.assertEqual(output, ['క।'])
+
+    def test_round_trip_through_devanagari(self):
+        telugu = 'పశువుల సంఖ్య'
+        unified = self.processor.preprocess_batch([telugu], 'tel_Telu', 'hin_Deva')[0].split(' ', 2)[2]
+        self.assertNotEqual(unified, telugu)
+        self.assertEqual(self.processor.postprocess_batch([unified], 'tel_Telu'), [telugu])
+
+    def test_single_string_and_latin_target(self):
+        self.assertEqual(self.processor.postprocess_batch('Hello  world !', 'eng_Latn'), ['Hello world!'])
+
+    def test_benchmark_reports_costs(self):
+        report = benchmark(count=50, rounds=1)
+        self.assertEqual(report['strings'], 50)
+        self.assertGreater(report['preprocess_us_per_1k'], 0)
+        self.assertNotIn('generate_us_per_1k', report)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Tests for the latency-aware model cascade (no model needed)
+
+Usage:
+    python test_model_cascade.py
+"""
+
+import unittest
+
+from model_pool import ModelPool
+from model_cascade import ModelCascade, CLASS_UI, CLASS_ALERT
+from overload_control import OverloadController, TIER_FULL
+from translation_cache import TranslationCache
+
+
+class FakeService:
+    """
+    Translates by tagging texts with the model name; texts starting with
+    'Hard' get a low score from every model but 'large'
+    """
+
+    def __init__(self, model_name, revision, cache):
+        self.model_name = model_name
+        self.model_revision = f'{model_name}@{revision}'
+        self.cache = cache
+        self.overload = OverloadController(slots=1)
+        self.calls = []
+
+    def translate(self, texts, target_lang, priority='interactive'):
+        self.calls.append(list(texts))
+        results = []
+        for text in texts:
+            translated = f'{self.model_name}:{text}'
+            self.cache.put(text, target_lang, translated, scope=self.model_revision)
+            score = -2.0 if text.startswith('Hard') and self.model_name != 'large' else -0.1
+            results.append({'translated': translated, 'tier': TIER_FULL, 'degraded': False,
+                            'score': score})
+        return results
+
+    def warm(self, samples):
+        pass
+
+    def unload(self):
+        pass
+
+
+def fake_pool(name, cache):
+    pool = ModelPool(lambda model_name, revision: FakeService(model_name, revision, cache))
+    pool.start(name, 'v1')
+    return pool
+
+
+def served(pool):
+    with pool.acquire() as service:
+        return service
+
+
+class ModelCascadeTest(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = TranslationCache()
+        self.small = fake_pool('small', self.cache)
+        self.large = fake_pool('large', self.cache)
+        self.cascade = ModelCascade([self.small, self.large])
+
+    def test_low_score_is_escalated(self):
+        results = self.cascade.translate(['Hard text', 'Easy'], 'hi')
+        self.assertEqual([(r['translated'], r['escalated']) for r in results],
+                         [('large:Hard text', True), ('small:Easy', False)])
+        stats = self.cascade.get_stats()
+        self.assertEqual((stats['large']['escalated_in'], stats['small']['texts']), (1, 2))
+
+    def test_ui_strings_are_never_escalated(self):
+        result = self.cascade.translate(['Hard label'], 'hi', CLASS_UI)[0]
+        self.assertEqual((result['model'], result['escalated']), ('small', False))
+        self.assertEqual(served(self.large).calls, [])
+
+    def test_long_alerts_start_on_largest_model(self):
+        self.cascade.long_text_chars = 10
+        result = self.cascade.translate(['Flood warning for the district'], 'hi', CLASS_ALERT)[0]
+        self.assertEqual(result['model'], 'large')
+
+    def test_budget_moves_request_down(self):
+        self.cascade.long_text_chars = 10
+        self.cascade.levels[1].seconds_per_char = 1.0
+        result = self.cascade.translate(['Flood warning for the district'], 'hi', CLASS_ALERT,
+                                        latency_budget=0.5)[0]
+        self.assertEqual(result['model'], 'small')
+
+    def test_escalation_skipped_when_budget_is_spent(self):
+        self.cascade.levels[1].seconds_per_char = 1.0
+        result = self.cascade.translate(['Hard text'], 'hi', latency_budget=0.5)[0]
+        self.assertEqual((result['model'], result['escalated']), ('small', False))
+
+    def test_escalated_hits_are_counted(self):
+        self.cascade.translate(['Hard text'], 'hi')
+        results = self.cascade.translate(['Hard text'], 'hi')
+        self.assertEqual((results[0]['translated'], results[0]['tier'], results[0]['escalated']),
+                         ('large:Hard text', 'hit', True))
+        # The second request never reached the small model
+        self.assertEqual(served(self.small).calls, [['Hard text']])
+        stats = self.cascade.get_stats()
+        self.assertEqual((stats['large']['requests'], stats['large']['texts']), (2, 2))
+        self.assertIn('p50', stats['large'])
+
+    def test_labels_follow_pool_swaps(self):
+        self.small.swap('small-v2', 'v1', warm=False, background=False)
+        self.cascade.translate(['Easy'], 'hi')
+        self.assertIn('small-v2', self.cascade.get_stats())
+
+    def test_levels_added_later(self):
+        cascade = ModelCascade([self.small])
+        self.assertEqual(cascade.translate(['Hard text'], 'hi')[0]['model'], 'small')
+        cascade.add_level(self.large)
+        result = cascade.translate(['Hard again'], 'hi')[0]
+        self.assertEqual((result['model'], result['escalated']), ('large', True))
+        self.assertEqual(list(cascade.get_stats()), ['small', 'large'])
+
+    def test_needs_a_level(self):
+        with self.assertRaises(ValueError):
+            ModelCascade([])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Tests for zero-downtime model swaps (no model needed)
+
+Usage:
+    python test_model_pool.py
+"""
+
+import threading
+import unittest
+
+from model_pool import ModelPool, STATE_IDLE, STATE_LOADING, STATE_WARMING, STATE_DRAINING
+
+
+class FakeService:
+    """Stands in for a loaded model and records warm-up and unload calls"""
+
+    def __init__(self, spec):
+        self.spec = spec
+        self.warmed = []
+        self.unloaded = False
+
+    def warm(self, samples):
+        self.warmed.extend(samples)
+
+    def unload(self):
+        self.unloaded = True
+
+
+class FakeLoader:
+
+    def __init__(self, fail=()):
+        self.fail = set(fail)
+        self.loaded = []
+
+    def __call__(self, model_name, revision):
+        if (model_name, revision) in self.fail:
+            raise RuntimeError('checkpoint not found')
+        service = FakeService((model_name, revision))
+        self.loaded.append(service)
+        return service
+
+
+class ModelPoolTest(unittest.TestCase):
+
+    def setUp(self):
+        self.loader = FakeLoader()
+        self.states = []
+        self.pool = ModelPool(self.loader, on_state=self.states.append)
+        self.pool.start('model', 'v1')
+
+    def active(self):
+        with self.pool.acquire() as service:
+            return service
+
+    def test_acquire_requires_start(self):
+        with self.assertRaises(RuntimeError):
+            with ModelPool(self.loader).acquire():
+                pass
+
+    def test_swap_switches_and_unloads_old(self):
+        old = self.active()
+        self.pool.swap('model', 'v2', background=False)
+        self.assertEqual(self.active().spec, ('model', 'v2'))
+        self.assertTrue(old.unloaded)
+        status = self.pool.get_status()
+        self.assertEqual((status['state'], status['swaps'], status['previous']),
+                         (STATE_IDLE, 1, ['model', 'v1']))
+
+    def test_states_are_reported(self):
+        self.pool.swap('model', 'v2', background=False)
+        self.assertEqual(self.states, [STATE_LOADING, STATE_IDLE, STATE_LOADING, STATE_WARMING,
+                                       STATE_DRAINING, STATE_IDLE])
+
+    def test_warm_replays_recent_inputs_in_small_batches(self):
+        self.pool.record(['a', 'b', 'c'], 'hi')
+        self.pool.record(['c', 'd', 'e'], 'hi')
+        self.pool.record(['x'], 'te')
+        self.pool.swap('model', 'v2', background=False)
+        self.assertEqual(self.active().warmed, [(['a', 'b', 'c', 'd'], 'hi'), (['e'], 'hi'), (['x'], 'te')])
+
+    def test_drain_waits_for_inflight_requests(self):
+        entered = threading.Event()
+        release = threading.Event()
+
+        def request():
+            with self.pool.acquire() as service:
+                entered.set()
+                release.wait(5)
+                self.assertFalse(service.unloaded)
+
+        worker = threading.Thread(target=request)
+        worker.start()
+        entered.wait(5)
+        old = self.active()
+        swap = self.pool.swap('model', 'v2')
+        swap.join(0.2)
+        # New requests already go to v2 while v1 drains
+        self.assertEqual(self.active().spec, ('model', 'v2'))
+        self.assertEqual(self.pool.state, STATE_DRAINING)
+        self.assertFalse(old.unloaded)
+        release.set()
+        worker.join()
+        swap.join(5)
+        self.assertTrue(old.unloaded)
+
+    def test_rollback_reuses_standby(self):
+        old = self.active()
+        self.pool.swap('model', 'v2', keep_previous=True, background=False)
+        self.assertFalse(old.unloaded)
+        self.assertEqual(self.pool.get_status()['standby'], ['model', 'v1'])
+
+        self.pool.rollback(background=False)
+        self.assertIs(self.active(), old)
+        self.assertEqual(len(self.loader.loaded), 2)
+        self.assertTrue(self.pool.last_swap['from_standby'])
+
+    def test_mismatched_standby_is_unloaded_first(self):
+        first = self.active()
+        self.pool.swap('model', 'v2', keep_previous=True, background=False)
+        self.pool.swap('model', 'v3', background=False)
+        self.assertTrue(first.unloaded)
+        self.assertEqual(self.active().spec, ('model', 'v3'))
+
+    def test_failed_load_keeps_active_model(self):
+        self.loader.fail.add(('model', 'bad'))
+        old = self.active()
+        with self.assertRaises(RuntimeError):
+            self.pool.swap('model', 'bad', background=False)
+        self.assertIs(self.active(), old)
+        self.assertIn('error', self.pool.last_swap)
+        self.assertEqual(self.pool.state, STATE_IDLE)
+
+        # In the background the error is only recorded
+        self.pool.swap('model', 'bad').join(5)
+        self.assertIs(self.active(), old)
+
+    def test_rollback_without_previous_model(self):
+        with self.assertRaises(RuntimeError):
+            self.pool.rollback()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Tests for overload control, the translation cache and load shedding in the
+indictrans2_service worker (no model needed)
+
+Usage:
+    python test_overload_control.py
+"""
+
+import time
+import threading
+import unittest
+
+from overload_control import (
+    OverloadController, TIER_FULL, TIER_GREEDY, TIER_CACHE, TIER_PASSTHROUGH,
+)
+from translation_cache import TranslationCache
+from pivot_router import PivotRouter
+from indictrans2_service import IndicTrans2Service
+
+
+def with_wait(controller, seconds):
+    """Pretend recent requests waited `seconds` for a slot"""
+    controller._wait_ewma = seconds
+    controller._wait_updated = time.monotonic()
+    return controller
+
+
+class OverloadControllerTest(unittest.TestCase):
+
+    def controller(self, **kwargs):
+        return OverloadController(budgets={'interactive': 1.0, 'batch': 10.0},
+                                  decay_seconds=1000.0, **kwargs)
+
+    def test_tiers_follow_estimated_wait(self):
+        cases = [(0.0, TIER_FULL), (0.3, TIER_GREEDY), (0.6, TIER_CACHE), (1.2, TIER_PASSTHROUGH)]
+        for wait, tier in cases:
+            self.assertEqual(with_wait(self.controller(), wait).choose_tier('interactive'), tier)
+
+    def test_budget_depends_on_priority(self):
+        controller = with_wait(self.controller(), 1.2)
+        self.assertEqual(controller.choose_tier('interactive'), TIER_PASSTHROUGH)
+        self.assertEqual(controller.choose_tier('batch'), TIER_FULL)
+        # Unknown priorities get the interactive budget
+        self.assertEqual(controller.choose_tier('other'), TIER_PASSTHROUGH)
+
+    def test_observed_wait_decays(self):
+        controller = OverloadController(decay_seconds=0.05)
+        with_wait(controller, 5.0)
+        time.sleep(0.3)
+        self.assertLess(controller.estimated_wait(), 0.1)
+
+    def test_queue_length_raises_estimate(self):
+        controller = self.controller()
+        controller._service_ewma = 0.5
+        controller._waiting = 3
+        self.assertAlmostEqual(controller.estimated_wait(), 1.5)
+
+    def test_slot_times_out(self):
+        controller = self.controller()
+        held = threading.Event()
+        release = threading.Event()
+
+        def holder():
+            with controller.slot() as acquired:
+                self.assertTrue(acquired)
+                held.set()
+                release.wait(5)
+
+        thread = threading.Thread(target=holder)
+        thread.start()
+        held.wait(5)
+        start = time.monotonic()
+        with controller.slot(timeout=0.1) as acquired:
+            self.assertFalse(acquired)
+        self.assertLess(time.monotonic() - start, 1.0)
+        release.set()
+        thread.join()
+
+        self.assertEqual(controller.get_metrics()['slot_timeouts'], 1)
+        with controller.slot(timeout=0.1) as acquired:
+            self.assertTrue(acquired)
+
+    def test_refresh_priority_is_never_shed(self):
+        controller = with_wait(OverloadController(decay_seconds=1000.0), 1000.0)
+        self.assertEqual(controller.choose_tier('refresh'), TIER_FULL)
+        with controller.slot(timeout=controller.budget('refresh')) as acquired:
+            self.assertTrue(acquired)
+
+    def test_metrics_count_degraded_tiers(self):
+        controller = self.controller()
+        controller.record('interactive', TIER_FULL, 3)
+        controller.record('interactive', TIER_CACHE)
+        controller.record('batch', TIER_PASSTHROUGH, 2)
+        metrics = controller.get_metrics()
+        self.assertEqual(metrics['tiers']['interactive'][TIER_FULL], 3)
+        self.assertEqual(metrics['degraded'], 3)
+
+    def test_phase_counts_are_separate(self):
+        controller = self.controller()
+        controller.record('interactive', TIER_FULL)
+        controller.set_phase('swap')
+        controller.record('interactive', TIER_GREEDY, 2)
+        controller.record('batch', TIER_PASSTHROUGH)
+        controller.set_phase(None)
+        controller.record('interactive', TIER_CACHE)
+        swap = controller.get_metrics()['phases']['swap']
+        self.assertEqual((swap[TIER_FULL], swap[TIER_GREEDY], swap['degraded']), (0, 2, 1))
+        self.assertEqual(controller.get_metrics()['degraded'], 2)
+
+
+class TranslationCacheTest(unittest.TestCase):
+
+    def test_scopes_are_separate(self):
+        cache = TranslationCache()
+        cache.put('Hello', 'hi', 'v1', scope='a')
+        self.assertEqual(cache.get('Hello', 'hi', scope='a'), 'v1')
+        self.assertIsNone(cache.get('Hello', 'hi', scope='b'))
+
+    def test_lru_eviction_drops_near_index(self):
+        cache = TranslationCache(maxsize=2)
+        cache.put('One', 'hi', '1')
+        cache.put('Two', 'hi', '2')
+        cache.get('One', 'hi')
+        cache.put('Three', 'hi', '3')
+        self.assertIsNone(cache.peek('Two', 'hi'))
+        self.assertIsNone(cache.lookup_degraded('two!', 'hi'))
+        self.assertEqual(cache.lookup_degraded('one!', 'hi'), '1')
+
+    def test_degraded_lookup_order(self):
+        cache = TranslationCache()
+        cache.add_phrases('hi', {'Hello world': 'नमस्ते संसार'})
+        self.assertEqual(cache.lookup_degraded('Hello world', 'hi'), 'नमस्ते संसार')
+        self.assertEqual(cache.lookup_degraded('hello,  WORLD', 'hi'), 'नमस्ते संसार')
+        cache.put('Hello world', 'hi', 'cached')
+        self.assertEqual(cache.lookup_degraded('Hello world', 'hi'), 'cached')
+        self.assertIsNone(cache.lookup_degraded('Goodbye', 'hi'))
+
+
+class FakeTranslator:
+    """Tags texts with the target language and records every call"""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, texts, src, tgt):
+        self.calls.append((src, tgt))
+        return [f'{tgt}:{text}' for text in texts]
+
+
+def worker_service(translator):
+    """IndicTrans2Service wired to a fake translator instead of the model"""
+    service = IndicTrans2Service()
+    service.router = PivotRouter(translator)
+    service.initialized = True
+    return service
+
+
+class WorkerSheddingTest(unittest.TestCase):
+
+    def test_results_carry_tier(self):
+        service = worker_service(FakeTranslator())
+        first = service.translate_batch(['Submit'], 'en', 'hi')[0]
+        self.assertEqual((first['translated'], first['tier'], first['degraded']),
+                         ('hin_Deva:Submit', TIER_FULL, False))
+        self.assertEqual(service.translate_batch(['Submit'], 'en', 'hi')[0]['tier'], 'hit')
+
+    def test_overloaded_batch_is_degraded(self):
+        service = worker_service(FakeTranslator())
+        with_wait(service.overload, 100.0)
+        results = service.translate_batch(['Hello world', 'Unknown text'], 'en', 'hi')
+        self.assertEqual([r['tier'] for r in results], [TIER_PASSTHROUGH, TIER_PASSTHROUGH])
+        self.assertTrue(all(r['degraded'] for r in results))
+
+    def test_queued_request_falls_back_to_phrase_table(self):
+        service = worker_service(FakeTranslator())
+        service.overload.budgets['interactive'] = 0.1
+        with service.overload.slot():
+            result = service.translate_text('Hello world', 'en', 'hi')
+        self.assertEqual(result['tier'], TIER_CACHE)
+        self.assertEqual(result['translated'], 'नमस्ते संसार')
+        self.assertTrue(result['degraded'])
+
+    def test_broadcast_shares_one_slot_and_is_shed(self):
+        translator = FakeTranslator()
+        service = worker_service(translator)
+        results = service.translate_multi(['नमस्ते'], 'hi', ['te', 'ta', 'bn'])
+        self.assertEqual({r[0]['tier'] for r in results.values()}, {TIER_FULL})
+        self.assertEqual([src for src, _ in translator.calls].count('hin_Deva'), 1)
+
+        service.overload.budgets['batch'] = 0.1
+        with service.overload.slot():
+            results = service.translate_multi(['पशु'], 'hi', ['te', 'ta'])
+        self.assertTrue(all(r[0]['degraded'] for r in results.values()))
+        self.assertEqual(service.overload.get_metrics()['tiers']['batch'][TIER_PASSTHROUGH], 2)
+
+    def test_failed_translation_is_degraded(self):
+        def broken(texts, src, tgt):
+            raise RuntimeError('boom')
+        result = worker_service(broken).translate_batch(['Submit'], 'en', 'hi')[0]
+        self.assertTrue(result['degraded'])
+        self.assertEqual(result['translated'], 'Submit')
+
+
+if __name__ == '__main__':
+    unittest.main()
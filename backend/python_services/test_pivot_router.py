@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Tests for Indic-to-Indic route selection (no model needed)
+
+Usage:
+    python test_pivot_router.py
+"""
+
+import unittest
+
+from pivot_router import PivotRouter, PIVOT_LANG, ROUTE_DIRECT, ROUTE_PIVOT
+
+
+class FakeModel:
+    """Tags texts with the language pair and records every call"""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, texts, src, tgt):
+        self.calls.append((src, tgt, list(texts)))
+        return [f'{tgt}:{text}' for text in texts]
+
+
+class PivotRouterTest(unittest.TestCase):
+
+    def test_needs_routing(self):
+        self.assertTrue(PivotRouter.needs_routing('hin_Deva', 'tel_Telu'))
+        self.assertFalse(PivotRouter.needs_routing(PIVOT_LANG, 'tel_Telu'))
+        self.assertFalse(PivotRouter.needs_routing('hin_Deva', PIVOT_LANG))
+        self.assertFalse(PivotRouter.needs_routing('hin_Deva', 'hin_Deva'))
+
+    def test_unmeasured_routes_are_tried_first(self):
+        router = PivotRouter(FakeModel(), explore_every=0)
+        self.assertEqual(router.choose_route('hin_Deva', 'tel_Telu'), ROUTE_DIRECT)
+        router._observe((ROUTE_DIRECT, 'hin_Deva', 'tel_Telu'), 1.0, 1)
+        self.assertEqual(router.choose_route('hin_Deva', 'tel_Telu'), ROUTE_PIVOT)
+
+    def test_unmeasured_fanout_starts_on_pivot(self):
+        router = PivotRouter(FakeModel(), explore_every=0)
+        self.assertEqual(router.choose_route('hin_Deva', 'tel_Telu', fanout=3), ROUTE_PIVOT)
+        self.assertEqual(router.choose_route('hin_Deva', 'tel_Telu', fanout=1), ROUTE_DIRECT)
+
+    def test_cold_fanout_decodes_source_once(self):
+        # A fresh router, as in a process spawned per request by the Node bridge
+        model = FakeModel()
+        router = PivotRouter(model)
+        targets = ['tel_Telu', 'tam_Taml', 'ben_Beng']
+        results, routes = router.translate_fanout(['नमस्ते'], 'hin_Deva', targets)
+
+        self.assertEqual(routes, {tgt: ROUTE_PIVOT for tgt in targets})
+        sources = [src for src, _, _ in model.calls]
+        self.assertEqual(sources.count('hin_Deva'), 1)
+        self.assertEqual(results['ben_Beng'], ['ben_Beng:eng_Latn:नमस्ते'])
+
+    def test_cheaper_route_wins(self):
+        router = PivotRouter(FakeModel(), explore_every=0)
+        router._observe((ROUTE_DIRECT, 'hin_Deva', 'tel_Telu'), 1.0, 1)
+        router._observe((ROUTE_PIVOT, 'hin_Deva', PIVOT_LANG), 0.8, 1)
+        router._observe((ROUTE_PIVOT, PIVOT_LANG, 'tel_Telu'), 0.5, 1)
+        self.assertEqual(router.choose_route('hin_Deva', 'tel_Telu'), ROUTE_DIRECT)
+        # Spread over four targets the source leg costs 0.2 per target
+        self.assertEqual(router.choose_route('hin_Deva', 'tel_Telu', fanout=4), ROUTE_PIVOT)
+        # A cached English intermediate makes the source leg free
+        self.assertEqual(router.choose_route('hin_Deva', 'tel_Telu', pivot_cached=1.0), ROUTE_PIVOT)
+
+    def test_losing_route_is_explored(self):
+        router = PivotRouter(FakeModel(), explore_every=3)
+        router._observe((ROUTE_DIRECT, 'hin_Deva', 'tel_Telu'), 0.1, 1)
+        router._observe((ROUTE_PIVOT, 'hin_Deva', PIVOT_LANG), 1.0, 1)
+        router._observe((ROUTE_PIVOT, PIVOT_LANG, 'tel_Telu'), 1.0, 1)
+        routes = [router.choose_route('hin_Deva', 'tel_Telu') for _ in range(6)]
+        self.assertEqual(routes.count(ROUTE_PIVOT), 2)
+
+    def test_unavailable_direct_pair_pivots(self):
+        router = PivotRouter(FakeModel(), direct_available=lambda src, tgt: False)
+        self.assertEqual(router.choose_route('hin_Deva', 'tel_Telu'), ROUTE_PIVOT)
+
+    def test_fanout_decodes_source_once(self):
+        model = FakeModel()
+        router = PivotRouter(model, direct_available=lambda src, tgt: False)
+        targets = ['tel_Telu', 'tam_Taml', 'ben_Beng']
+        results, routes = router.translate_fanout(['a', 'b', 'a'], 'hin_Deva', targets)
+
+        self.assertEqual(set(routes.values()), {ROUTE_PIVOT})
+        to_english = [call for call in model.calls if call[1] == PIVOT_LANG]
+        self.assertEqual(to_english, [('hin_Deva', PIVOT_LANG, ['a', 'b'])])
+        self.assertEqual(results['tam_Taml'], ['tam_Taml:eng_Latn:a', 'tam_Taml:eng_Latn:b',
+                                               'tam_Taml:eng_Latn:a'])
+
+        # The English intermediate is cached for the next fan-out
+        model.calls.clear()
+        router.translate_fanout(['a'], 'hin_Deva', ['tel_Telu'])
+        self.assertEqual(model.calls, [(PIVOT_LANG, 'tel_Telu', ['eng_Latn:a'])])
+        self.assertEqual(router.get_stats()['pivot_cache_hits'], 1)
+
+    def test_fanout_mixed_targets(self):
+        model = FakeModel()
+        router = PivotRouter(model)
+        results, routes = router.translate_fanout(['x'], 'hin_Deva', ['hin_Deva', PIVOT_LANG, 'tel_Telu'])
+        self.assertEqual(results['hin_Deva'], ['x'])
+        self.assertEqual(results[PIVOT_LANG], ['eng_Latn:x'])
+        self.assertEqual(routes['tel_Telu'], ROUTE_DIRECT)
+        self.assertEqual(results['tel_Telu'], ['tel_Telu:x'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Translation Cache
+In-process LRU cache of translations with a near-match index and a pinned
+phrase table, used for normal cache hits and for degraded answers under load
+"""
+
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+# Punctuation and symbols ignored when looking for a near match
+_NEAR_MATCH_STRIP = re.compile(r'[^\w\s]+', re.UNICODE)
+_WHITESPACE = re.compile(r'\s+', re.UNICODE)
+
+
+def normalize_for_match(text: str) -> str:
+    """Case-, punctuation- and whitespace-insensitive form of a text"""
+    return _WHITESPACE.sub(' ', _NEAR_MATCH_STRIP.sub(' ', text.casefold())).strip()
+
+
+class TranslationCache:
+    """
+    Thread-safe LRU cache keyed by (scope, language, text)
+
+    The scope keeps entries produced by different model revisions apart, so
+    one cache can be shared across a model swap. Besides exact lookups it
+    keeps an index of normalized texts so that "Hello world!" can be served
+    from the entry for "hello world", and a pinned, unscoped phrase table
+    that is never evicted.
+    """
+
+    def __init__(self, maxsize: int = 1000):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Tuple[str, str, str], str]" = OrderedDict()
+        self._near: Dict[Tuple[str, str, str], Tuple[str, str, str]] = {}
+        self._phrases: Dict[Tuple[str, str], str] = {}
+        self._phrases_near: Dict[Tuple[str, str], str] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, text: str, lang: str, scope: str = '') -> Optional[str]:
+        """Exact lookup"""
+        key = (scope, lang, text)
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def peek(self, text: str, lang: str, scope: str = '') -> Optional[str]:
+        """Exact lookup that leaves LRU order and hit counters untouched"""
+        with self._lock:
+            return self._entries.get((scope, lang, text))
+
+    def put(self, text: str, lang: str, translation: str, scope: str = '') -> None:
+        key = (scope, lang, text)
+        with self._lock:
+            self._entries[key] = translation
+            self._entries.move_to_end(key)
+            self._near[(scope, lang, normalize_for_match(text))] = key
+            while len(self._entries) > self.maxsize:
+                old_key, _ = self._entries.popitem(last=False)
+                near_key = (old_key[0], old_key[1], normalize_for_match(old_key[2]))
+                if self._near.get(near_key) == old_key:
+                    del self._near[near_key]
+
+    def add_phrases(self, lang: str, phrases: Dict[str, str]) -> None:
+        """Pin curated translations that are never evicted"""
+        with self._lock:
+            for text, translation in phrases.items():
+                self._phrases[(lang, text)] = translation
+                self._phrases_near[(lang, normalize_for_match(text))] = translation
+
+    def lookup_degraded(self, text: str, lang: str, scope: str = '') -> Optional[str]:
+        """
+        Best answer available without running the model: exact cache hit,
+        then phrase table, then near matches in either
+        """
+        key = (scope, lang, text)
+        near = (scope, lang, normalize_for_match(text))
+        with self._lock:
+            if key in self._entries:
+                return self._entries[key]
+            phrase = self._phrases.get((lang, text))
+            if phrase is not None:
+                return phrase
+            near_key = self._near.get(near)
+            if near_key is not None and near_key in self._entries:
+                return self._entries[near_key]
+            return self._phrases_near.get(near[1:])
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._near.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            'size': len(self._entries),
+            'phrases': len(self._phrases),
+            'hits': self.hits,
+            'misses': self.misses,
+        }
@@ -5,51 +5,43 @@ AI-powered translation service for Indian languages using AI4Bharat's IndicTrans
 """
 
 import torch
+import os
 import sys
 import json
 import logging
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Any, Tuple
 from transformers import AutoModelForSeq2SeqLM, AutoTokenizer
-# from IndicTransToolkit.processor import IndicProcessor  # Using simplified version
 import traceback
-from functools import lru_cache
+import time
+import gc
+import threading
+
+from translation_cache import TranslationCache
+from overload_control import OverloadController, TIER_FULL, TIER_GREEDY, TIER_CACHE, TIER_PASSTHROUGH
+from mock_translation import MOCK_TRANSLATIONS
+from indic_processing import IndicProcessor
+from model_pool import ModelPool, STATE_IDLE
+from model_cascade import ModelCascade
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Simple processor to replace IndicTransToolkit
-class SimpleIndicProcessor:
-    """Simple processor for IndicTrans2 without external dependencies"""
-    
-    def __init__(self, inference=True):
-        self.inference = inference
-    
-    def preprocess_batch(self, texts, src_lang, tgt_lang):
-        """Simple preprocessing for IndicTrans2"""
-        # For IndicTrans2, the format should be: <2xx> text where xx is target language
-        processed = []
-        for text in texts:
-            # Just return the text as-is for now, the model handles language routing internally
-            processed.append(text.strip())
-        return processed
-    
-    def postprocess_batch(self, generated_tokens, lang):
-        """Simple postprocessing - clean up the generated text"""
-        if isinstance(generated_tokens, list):
-            return [self._clean_text(text) for text in generated_tokens]
-        return [self._clean_text(generated_tokens)]
-    
-    def _clean_text(self, text):
-        """Clean up generated text"""
-        if isinstance(text, str):
-            # Remove language tokens and clean
-            cleaned = text.strip()
-            # Remove common artifacts
-            cleaned = cleaned.replace('<pad>', '').replace('</s>', '')
-            cleaned = cleaned.replace('<s>', '').strip()
-            return cleaned
-        return str(text)
+DEFAULT_MODEL_NAME = "ai4bharat/indictrans2-en-indic-dist-200M"
+
+# Checkpoints of the cascade, smallest first; the first one is the default model
+DEFAULT_CASCADE_MODELS = [
+    DEFAULT_MODEL_NAME,
+    "ai4bharat/indictrans2-en-indic-1B",
+]
+
+def _new_cache() -> TranslationCache:
+    """Translation cache seeded with the phrase table"""
+    cache = TranslationCache(maxsize=1000)
+    # Curated translations double as the phrase table for degraded answers
+    for lang, phrases in MOCK_TRANSLATIONS.items():
+        cache.add_phrases(lang, phrases)
+    return cache
 
 class IndicTrans2Service:
     """
@@ -85,13 +77,22 @@ class IndicTrans2Service:
         'bpy': 'bpy_Beng', # Bishnupriya
     }
     
-    def __init__(self):
+    def __init__(self, model_name: Optional[str] = None, revision: Optional[str] = None,
+                 cache: Optional[TranslationCache] = None, overload: Optional[OverloadController] = None):
         self.device = "cuda" if torch.cuda.is_available() else "cpu"
-        self.model_name = "ai4bharat/indictrans2-en-indic-dist-200M"
+        self.model_name = model_name or DEFAULT_MODEL_NAME
+        # Hub revision (branch, tag or commit) of the checkpoint
+        self.revision = revision or os.environ.get("INDICTRANS2_REVISION", "main")
+        # Commit the revision resolved to, so a moved branch counts as a new model
+        self.commit_hash = None
         self.tokenizer = None
         self.model = None
         self.processor = None
         self.src_lang = "eng_Latn"  # English source
+        # Cache and overload state may be shared with other model versions;
+        # cache entries are scoped by model_revision
+        self.cache = cache if cache is not None else _new_cache()
+        self.overload = overload if overload is not None else OverloadController(slots=1)
         
         logger.info(f"Initializing IndicTrans2 service on device: {self.device}")
         self._load_model()
@@ -104,11 +105,13 @@ class IndicTrans2Service:
             # Load tokenizer
             self.tokenizer = AutoTokenizer.from_pretrained(
                 self.model_name, 
+                revision=self.revision,
                 trust_remote_code=True
             )
             
             # Load model
             model_kwargs = {
+                "revision": self.revision,
                 "trust_remote_code": True,
                 "torch_dtype": torch.float16 if self.device == "cuda" else torch.float32
             }
@@ -124,9 +127,10 @@ class IndicTrans2Service:
                 self.model_name, 
                 **model_kwargs
             ).to(self.device)
+            self.commit_hash = self._resolve_commit()
             
-            # Initialize simple processor (alternative to IndicProcessor)
-            self.processor = SimpleIndicProcessor()
+            # Batched pre/post-processing (replaces IndicTransToolkit's IndicProcessor)
+            self.processor = IndicProcessor(inference=True)
             
             logger.info("IndicTrans2 model loaded successfully!")
             
@@ -135,27 +139,99 @@ class IndicTrans2Service:
             logger.error(traceback.format_exc())
             raise
     
-    @lru_cache(maxsize=1000)
-    def translate_cached(self, text: str, target_lang: str) -> str:
+    def _resolve_commit(self) -> Optional[str]:
+        """
+        Hub commit SHA of the loaded checkpoint, or None for local checkpoints
+        """
+        commit = getattr(self.model.config, "_commit_hash", None)
+        if commit or os.path.isdir(self.model_name):
+            return commit
+        try:
+            from huggingface_hub import model_info
+            return model_info(self.model_name, revision=self.revision).sha
+        except Exception as e:
+            logger.warning(f"Could not resolve the commit of {self.model_name}@{self.revision}: {e}")
+            return None
+    
+    def translate_cached(self, text: str, target_lang: str, priority: str = 'interactive') -> str:
         """
         Cached translation to avoid recomputing identical translations
         """
-        return self._translate_single(text, target_lang)
+        return self.translate([text], target_lang, priority)[0]['translated']
     
-    def _translate_single(self, text: str, target_lang: str) -> str:
+    def translate(self, texts: List[str], target_lang: str,
+                  priority: str = 'interactive') -> List[Dict[str, Any]]:
         """
-        Translate a single text to target language
+        Translate texts, stepping down to cheaper tiers when the model is overloaded
+        
+        Returns one dict per text with 'translated', 'tier' and 'degraded', plus
+        'score' (mean token log-probability) for freshly generated text
         """
         if target_lang not in self.SUPPORTED_LANGUAGES:
             logger.warning(f"Unsupported language: {target_lang}")
-            return text  # Return original text if language not supported
+            # Return original text if language not supported
+            return [{'translated': text, 'tier': TIER_PASSTHROUGH, 'degraded': False} for text in texts]
+        
+        start = time.monotonic()
+        results: List[Optional[Dict[str, Any]]] = [None] * len(texts)
+        misses: Dict[str, List[int]] = {}
+        
+        for i, text in enumerate(texts):
+            cached = self.cache.get(text, target_lang, scope=self.model_revision)
+            if cached is not None:
+                results[i] = {'translated': cached, 'tier': 'hit', 'degraded': False}
+            else:
+                misses.setdefault(text, []).append(i)
+        
+        if misses:
+            pending = list(misses)
+            tier = self.overload.choose_tier(priority)
+            generated = None
+            
+            if tier in (TIER_FULL, TIER_GREEDY):
+                remaining = self.overload.budget(priority) - (time.monotonic() - start)
+                with self.overload.slot(timeout=remaining) as acquired:
+                    if acquired:
+                        num_beams = 4 if tier == TIER_FULL else 1
+                        generated = self._generate(pending, target_lang, num_beams)
+                if generated is None:
+                    # Budget ran out while queued for the model, or generation failed
+                    tier = TIER_CACHE
+            
+            for j, text in enumerate(pending):
+                if generated is not None:
+                    translations, scores = generated
+                    result = {'translated': translations[j], 'tier': tier, 'degraded': False,
+                              'score': scores[j]}
+                else:
+                    fallback = None
+                    if tier == TIER_CACHE:
+                        fallback = self.cache.lookup_degraded(text, target_lang, scope=self.model_revision)
+                    result = {
+                        'translated': fallback if fallback is not None else text,
+                        'tier': TIER_CACHE if fallback is not None else TIER_PASSTHROUGH,
+                        'degraded': True,
+                    }
+                self.overload.record(priority, result['tier'])
+                for i in misses[text]:
+                    results[i] = result
         
+        return results
+    
+    def _generate(self, texts: List[str], target_lang: str,
+                  num_beams: int = 4) -> Optional[Tuple[List[str], List[float]]]:
+        """
+        Run the model on a batch of texts and cache the results
+        
+        Returns (translations, scores), where a score is the length-normalized
+        log-probability of the output sequence, or None if generation failed
+        """
         try:
             tgt_lang = self.SUPPORTED_LANGUAGES[target_lang]
             
-            # Preprocess text (simplified without IndicTransToolkit)
+            # Normalize and add the language-tag prefix
             batch = self.processor.preprocess_batch(
-                [text], 
+                texts, 
                 src_lang=self.src_lang, 
                 tgt_lang=tgt_lang
             )
@@ -171,38 +247,59 @@ class IndicTrans2Service:
             
             # Generate translation
             with torch.no_grad():
-                generated_tokens = self.model.generate(
+                outputs = self.model.generate(
                     **inputs,
                     use_cache=True,
                     min_length=1,
                     max_length=256,
-                    num_beams=4,
+                    num_beams=num_beams,
                     num_return_sequences=1,
                     do_sample=False,
-                    early_stopping=True
+                    early_stopping=num_beams > 1,
+                    output_scores=True,
+                    return_dict_in_generate=True
                 )
+                scores = self._sequence_scores(outputs)
             
             # Decode
             with self.tokenizer.as_target_tokenizer():
                 generated_tokens = self.tokenizer.batch_decode(
-                    generated_tokens.detach().cpu().tolist(),
+                    outputs.sequences.detach().cpu().tolist(),
                     skip_special_tokens=True,
                     clean_up_tokenization_spaces=True,
                 )
             
-            # Postprocess (simplified without IndicTransToolkit)
+            # Clean up and convert back to the target script
             translations = self.processor.postprocess_batch(
                 generated_tokens, 
                 lang=tgt_lang
             )
             
-            return translations[0] if translations else text
+            for text, translation in zip(texts, translations):
+                self.cache.put(text, target_lang, translation, scope=self.model_revision)
+            return translations, scores
             
         except Exception as e:
-            logger.error(f"Translation error for '{text}' to {target_lang}: {e}")
-            return text  # Fallback to original text
+            logger.error(f"Translation error for {len(texts)} text(s) to {target_lang}: {e}")
+            return None
     
-    def translate_batch(self, texts: List[str], target_lang: str) -> List[str]:
+    def _sequence_scores(self, outputs) -> List[float]:
+        """
+        Mean per-token log-probability of each generated sequence
+        """
+        # Beam search already reports length-normalized sequence scores
+        if getattr(outputs, "sequences_scores", None) is not None:
+            return outputs.sequences_scores.detach().cpu().tolist()
+        
+        transition = self.model.compute_transition_scores(
+            outputs.sequences, outputs.scores, normalize_logits=True
+        )
+        generated = outputs.sequences[:, -transition.shape[1]:]
+        mask = (generated != self.tokenizer.pad_token_id) & torch.isfinite(transition)
+        totals = transition.masked_fill(~mask, 0.0).sum(dim=1)
+        return (totals / mask.sum(dim=1).clamp(min=1)).detach().cpu().tolist()
+    
+    def translate_batch(self, texts: List[str], target_lang: str, priority: str = 'batch') -> List[str]:
         """
         Translate a batch of texts to target language
         """
@@ -214,20 +311,74 @@ class IndicTrans2Service:
             return []
         
         try:
-            tgt_lang = self.SUPPORTED_LANGUAGES[target_lang]
-            
-            # Use cached translation for individual texts
-            translations = []
-            for text in texts:
-                translation = self.translate_cached(text, target_lang)
-                translations.append(translation)
-            
-            return translations
+            return [result['translated'] for result in self.translate(texts, target_lang, priority)]
             
         except Exception as e:
             logger.error(f"Batch translation error: {e}")
             return texts  # Fallback to original texts
     
+    def warm(self, samples: List[tuple]) -> None:
+        """
+        Run (texts, target_lang) samples through the model before it takes traffic
+        
+        Results land in this revision's cache scope, so replayed inputs are hits
+        from the first request on. Replay shares the model slot with live
+        traffic, so it waits while requests are queued and gives up once they
+        have kept it waiting for the batch budget. It is capped at a quarter of
+        the cache so it cannot evict the active revision's hot entries.
+        """
+        if not samples:
+            samples = [(["Hello"], "hi")]
+        remaining = self.cache.maxsize // 4
+        for texts, target_lang in samples:
+            if remaining <= 0:
+                break
+            if target_lang not in self.SUPPORTED_LANGUAGES:
+                continue
+            if not self._wait_for_idle(self.overload.budget('batch')):
+                logger.warning("Live requests are queued, stopping warm-up early")
+                return
+            texts = texts[:remaining]
+            with self.overload.slot(timeout=self.overload.budget('batch')) as acquired:
+                if not acquired:
+                    logger.warning("Model busy, stopping warm-up early")
+                    return
+                # Full beam search: these outputs are served as cache hits later
+                self._generate(texts, target_lang)
+            remaining -= len(texts)
+    
+    def _wait_for_idle(self, timeout: float) -> bool:
+        """
+        Wait until no request is queued for the model slot
+        """
+        deadline = time.monotonic() + timeout
+        while self.overload.waiting > 0:
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.05)
+        return True
+    
+    def unload(self) -> None:
+        """
+        Release the model's memory once it no longer serves requests
+        """
+        self.model = None
+        self.tokenizer = None
+        gc.collect()
+        if self.device == "cuda":
+            torch.cuda.empty_cache()
+        logger.info(f"Unloaded {self.model_revision}")
+    
+    @property
+    def model_revision(self) -> str:
+        """
+        Identifier of the loaded checkpoint, recorded alongside stored translations
+        
+        Uses the resolved commit rather than the branch or tag name, so the
+        manifest and cache scopes notice when the checkpoint behind a branch changes.
+        """
+        return f"{self.model_name}@{self.commit_hash or self.revision}"
+    
     def get_supported_languages(self) -> Dict[str, str]:
         """
         Get list of supported languages
@@ -237,55 +388,241 @@ class IndicTrans2Service:
             for code, lang_code in self.SUPPORTED_LANGUAGES.items()
         }
 
-# Global service instance
-translation_service = None
+# Global model pool; the cache and overload state are shared across model swaps
+model_pool = None
+shared_cache = None
+shared_overload = None
+model_cascade = None
+_init_lock = threading.Lock()
+# Separate from _init_lock so setting up the cascade never blocks default-model requests
+_cascade_lock = threading.Lock()
+
+def _load_service(model_name: str, revision: str) -> IndicTrans2Service:
+    """Load one model version for the pool"""
+    return IndicTrans2Service(model_name, revision, cache=shared_cache, overload=shared_overload)
+
+def _track_deploy(state: str) -> None:
+    """Count requests served while a model swap is in progress under the 'swap' phase"""
+    shared_overload.set_phase(None if state == STATE_IDLE else 'swap')
 
-def initialize_service():
+def initialize_service() -> ModelPool:
     """Initialize the translation service"""
-    global translation_service
-    if translation_service is None:
-        translation_service = IndicTrans2Service()
-    return translation_service
+    global model_pool, shared_cache, shared_overload
+    if model_pool is not None:
+        return model_pool
+    with _init_lock:
+        if model_pool is None:
+            shared_cache = _new_cache()
+            shared_overload = OverloadController(slots=1)
+            pool = ModelPool(_load_service, on_state=_track_deploy)
+            pool.start(
+                os.environ.get("INDICTRANS2_MODEL", DEFAULT_MODEL_NAME),
+                os.environ.get("INDICTRANS2_REVISION", "main")
+            )
+            model_pool = pool
+    return model_pool
 
 def translate_text(text: str, target_lang: str) -> str:
     """
     Translate text to target language
     """
-    service = initialize_service()
-    return service.translate_cached(text, target_lang)
+    pool = initialize_service()
+    pool.record([text], target_lang)
+    with pool.acquire() as service:
+        return service.translate_cached(text, target_lang)
+
+def translate_detailed(texts: List[str], target_lang: str, priority: str = 'interactive') -> List[Dict[str, Any]]:
+    """
+    Translate texts and report the service tier used for each
+    """
+    pool = initialize_service()
+    pool.record(texts, target_lang)
+    with pool.acquire() as service:
+        return service.translate(texts, target_lang, priority)
 
 def translate_batch(texts: List[str], target_lang: str) -> List[str]:
     """
     Translate batch of texts to target language
     """
-    service = initialize_service()
-    return service.translate_batch(texts, target_lang)
+    pool = initialize_service()
+    pool.record(texts, target_lang)
+    with pool.acquire() as service:
+        return service.translate_batch(texts, target_lang)
 
 def get_supported_languages() -> Dict[str, str]:
     """
     Get supported languages
     """
-    service = initialize_service()
-    return service.get_supported_languages()
+    return {
+        code: lang_code.split('_')[0].title() 
+        for code, lang_code in IndicTrans2Service.SUPPORTED_LANGUAGES.items()
+    }
+
+def get_model_revision() -> str:
+    """
+    Get the identifier of the model currently serving traffic
+    """
+    with initialize_service().acquire() as service:
+        return service.model_revision
+
+def get_overload_metrics() -> Dict[str, Any]:
+    """
+    Get tier counters and queue state
+    """
+    initialize_service()
+    return shared_overload.get_metrics()
+
+def _load_cascade_levels(cascade: ModelCascade, names: List[str]) -> None:
+    """
+    Load the larger cascade checkpoints one by one, smallest first, and add
+    each to the cascade once it is ready
+    """
+    for entry in names:
+        name, _, revision = entry.partition("@")
+        revision = revision or os.environ.get("INDICTRANS2_REVISION", "main")
+        # Each larger checkpoint queues separately, so it gets its own overload state
+        overload = OverloadController(slots=1)
+        level_pool = ModelPool(
+            lambda model_name, revision, overload=overload: IndicTrans2Service(
+                model_name, revision, cache=shared_cache, overload=overload
+            )
+        )
+        try:
+            level_pool.start(name, revision)
+        except Exception as e:
+            logger.error(f"Could not load cascade model {name}@{revision}, leaving it out: {e}")
+            continue
+        cascade.add_level(level_pool)
+        logger.info(f"Cascade model {name}@{revision} is serving")
+
+def initialize_cascade() -> ModelCascade:
+    """
+    Set up the cascade checkpoints (INDICTRANS2_CASCADE, comma-separated,
+    smallest first, optionally as name@revision); the first level is the
+    default model pool. The larger checkpoints load in the background and
+    requests stay on the default model until they are ready.
+    """
+    global model_cascade
+    if model_cascade is not None:
+        return model_cascade
+    pool = initialize_service()
+    with _cascade_lock:
+        if model_cascade is None:
+            names = os.environ.get("INDICTRANS2_CASCADE")
+            names = [n.strip() for n in names.split(",") if n.strip()] if names else DEFAULT_CASCADE_MODELS
+            cascade = ModelCascade([pool])
+            threading.Thread(
+                target=_load_cascade_levels, args=(cascade, names[1:]),
+                name='cascade-load', daemon=True
+            ).start()
+            model_cascade = cascade
+    return model_cascade
+
+def translate_routed(texts: List[str], target_lang: str, content_class: str = 'default',
+                     latency_budget: Optional[float] = None,
+                     priority: str = 'interactive') -> List[Dict[str, Any]]:
+    """
+    Translate texts on the checkpoint the cascade picks for this request
+    """
+    cascade = initialize_cascade()
+    model_pool.record(texts, target_lang)
+    return cascade.translate(texts, target_lang, content_class, latency_budget, priority)
+
+def get_cascade_stats() -> Dict[str, Any]:
+    """
+    Get traffic share and latency of each cascade checkpoint
+    """
+    return initialize_cascade().get_stats()
+
+def swap_model(model_name: Optional[str] = None, revision: str = "main",
+               keep_previous: bool = False, wait: bool = False) -> Dict[str, Any]:
+    """
+    Load another model version or checkpoint next to the active one, warm it
+    with recent inputs and switch traffic over without dropping requests
+    """
+    pool = initialize_service()
+    model_name = model_name or pool.active_spec[0]
+    pool.swap(model_name, revision, keep_previous=keep_previous, background=not wait)
+    return pool.get_status()
+
+def rollback_model(wait: bool = False) -> Dict[str, Any]:
+    """
+    Swap back to the previously active model
+    """
+    pool = initialize_service()
+    pool.rollback(background=not wait)
+    return pool.get_status()
+
+def model_status() -> Dict[str, Any]:
+    """
+    Get the model pool state
+    """
+    return initialize_service().get_status()
+
+class BridgeAdapter:
+    """
+    Module API in the shape bridge_protocol.BridgeServer expects, so a
+    long-lived worker can serve translations and model swaps
+    """
+    
+    def translate_batch(self, texts: List[str], src_lang: str, tgt_lang: str) -> List[Dict[str, Any]]:
+        priority = 'interactive' if len(texts) == 1 else 'batch'
+        return [{
+            'success': True,
+            'original': text,
+            'translated': result['translated'],
+            'source_language': src_lang,
+            'target_language': tgt_lang,
+            'tier': result['tier'],
+            'degraded': result['degraded']
+        } for text, result in zip(texts, translate_detailed(texts, tgt_lang, priority))]
+    
+    def get_supported_languages(self) -> List[str]:
+        return list(IndicTrans2Service.SUPPORTED_LANGUAGES)
+    
+    def swap_model(self, **kwargs) -> Dict[str, Any]:
+        return swap_model(**kwargs)
+    
+    def rollback_model(self, **kwargs) -> Dict[str, Any]:
+        return rollback_model(**kwargs)
+    
+    def model_status(self) -> Dict[str, Any]:
+        return model_status()
 
 # CLI interface for testing
 if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--serve":
+        from bridge_protocol import serve
+        initialize_service()
+        serve(BridgeAdapter(), sys.argv[2] if len(sys.argv) > 2 else "binary")
+        sys.exit(0)
+    
     if len(sys.argv) < 3:
-        print("Usage: python translation_service.py <text> <target_lang>")
+        print("Usage: python translation_service.py <text> <target_lang> [ui|alert|default]")
+        print("       python translation_service.py --serve [binary|jsonl]")
         print("Example: python translation_service.py 'Hello world' hi")
         sys.exit(1)
     
     text = sys.argv[1]
     target_lang = sys.argv[2]
+    # Optional content class (ui, alert, default) routes through the model cascade
+    content_class = sys.argv[3] if len(sys.argv) > 3 else None
     
     try:
-        result = translate_text(text, target_lang)
-        print(json.dumps({
+        if content_class:
+            result = translate_routed([text], target_lang, content_class)[0]
+        else:
+            result = translate_detailed([text], target_lang)[0]
+        output = {
             "success": True,
             "original": text,
-            "translated": result,
-            "target_language": target_lang
-        }, ensure_ascii=False, indent=2))
+            "translated": result['translated'],
+            "target_language": target_lang,
+            "degraded": result['degraded']
+        }
+        if 'model' in result:
+            output["model"] = result['model']
+        print(json.dumps(output, ensure_ascii=False, indent=2))
     except Exception as e:
         print(json.dumps({
             "success": False,